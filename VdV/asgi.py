@@ -9,8 +9,11 @@ https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 
 import os
 
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "VdV.settings")
+# Keeps the middleware stack fully async (see ASGI_SERVER in settings)
+os.environ.setdefault("VDV_ASGI", "1")
 
-application = get_asgi_application()
+application = ASGIStaticFilesHandler(get_asgi_application())
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -44,19 +45,26 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.ServerTimingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.middleware.ProfilingMiddleware",
     "allauth.account.middleware.AccountMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     'django.middleware.locale.LocaleMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
 ]
 
+# WhiteNoise is sync-only middleware: under ASGI it would push every async view back onto
+# a single worker thread, so VdV/asgi.py serves static files with ASGIStaticFilesHandler instead
+ASGI_SERVER = os.environ.get("VDV_ASGI") == "1"
+if not ASGI_SERVER:
+    MIDDLEWARE.append('whitenoise.middleware.WhiteNoiseMiddleware')
+
 ROOT_URLCONF = "VdV.urls"
 
 TEMPLATES = [
@@ -81,10 +89,26 @@ WSGI_APPLICATION = "VdV.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# SQLite concurrency profile, applied to every new connection by core.signals.apply_sqlite_profile.
+# Set VDV_SQLITE_PROFILE=default to fall back to SQLite's stock settings (e.g. for load test baselines).
+SQLITE_PRODUCTION_PROFILE = os.environ.get("VDV_SQLITE_PROFILE", "production") != "default"
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",        # readers no longer block the writer
+    "synchronous": "NORMAL",      # durable with WAL, far fewer fsyncs
+    "busy_timeout": 20000,        # ms to wait for the write lock instead of "database is locked"
+    "mmap_size": 268435456,       # 256 MB memory-mapped reads
+    "cache_size": -65536,         # 64 MB page cache (negative = KiB)
+    "temp_store": "MEMORY",
+} if SQLITE_PRODUCTION_PROFILE else {}
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "NAME": os.environ.get("VDV_DB_NAME", BASE_DIR / "db.sqlite3"),
+        # IMMEDIATE takes the write lock at BEGIN, so write transactions wait on busy_timeout
+        # instead of failing when upgrading a read lock
+        "OPTIONS": {"timeout": 20, "transaction_mode": "IMMEDIATE"} if SQLITE_PRODUCTION_PROFILE else {},
     }
 }
 
@@ -161,4 +185,57 @@ LANGUAGES = [
     ('fr', 'Français'),                   # french - FR
 ]
 
-STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
\ No newline at end of file
+STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+
+# Write-behind vote ingestion (core.vote_buffer): votes are acknowledged with 202 and
+# inserted in batches by a background flusher. Enable during vote surges.
+VOTE_WRITE_BEHIND = False
+
+VOTE_BUFFER_BATCH_SIZE = 500
+
+VOTE_BUFFER_FLUSH_INTERVAL = 0.2  # seconds
+
+# Background workers that re-encode uploaded report images to WebP (core.images)
+IMAGE_WORKERS = 2
+
+# Threads running the NLP models for async views (core.executors); each holds a CPU core while busy
+NLP_WORKERS = 2
+
+# Admission control for the NLP stages: requests waiting beyond the workers before 503s,
+# and the per-user token bucket (burst size, refill per minute) before 429s
+NLP_QUEUE_SIZE = 8
+
+NLP_USER_BURST = 5
+
+NLP_USER_RATE_PER_MINUTE = 10
+
+# Live feed (core.events): replayable history, per-client queue, idle ping and client retry delay
+EVENTS_HISTORY_SIZE = 500
+
+EVENTS_QUEUE_SIZE = 100
+
+EVENTS_HEARTBEAT = 15  # seconds
+
+EVENTS_RETRY_MS = 5000
+
+# Bearer token for Prometheus scrapes of /metrics; staff sessions can always read it
+METRICS_TOKEN = os.environ.get("VDV_METRICS_TOKEN", "")
+
+# SQL fingerprint aggregates (core.querylog) and the slow-query log threshold
+QUERY_LOG_MAX_FINGERPRINTS = 500
+
+QUERY_LOG_SAMPLE_SIZE = 200
+
+SLOW_QUERY_MS = 100
+
+# On-demand sampling profiles for staff requests (core.profiling)
+PROFILE_DIR = BASE_DIR / "profiles"
+
+PROFILE_INTERVAL = 0.005  # seconds between samples
+
+PROFILE_MAX_FILES = 50
+
+PROFILE_MAX_AGE_DAYS = 7
+
+# Replace the NLP models with cheap stand-ins, to load test the database and geo layers (core.utils)
+NLP_STUBS = os.environ.get("VDV_NLP_STUBS") == "1"
@@ -0,0 +1,38 @@
+# benchmarks.conftest
+import sys
+
+import pytest
+from django.db import transaction
+
+from core.models import User
+from core.synthetic import generate_dataset
+
+# Every benchmark runs against the same synthetic dataset, so results are comparable across commits
+DATASET_SEED = 0
+DATASET_REPORTS = 1000
+
+
+@pytest.fixture(scope="package")
+def dataset(django_db_setup, django_db_blocker):
+    # Seeded in a transaction rolled back once the benchmarks are done, so test modules collected
+    # after them (core/tests.py) start from an empty database again
+    seeding = transaction.atomic()
+    with django_db_blocker.unblock():
+        seeding.__enter__()
+        try:
+            dataset = generate_dataset(DATASET_REPORTS, seed=DATASET_SEED)
+            # The first user owns reports, votes and comments and may read the staff-only statistics
+            User.objects.filter(id=dataset["users"][0]).update(is_staff=True)
+        except BaseException:
+            seeding.__exit__(*sys.exc_info())
+            raise
+    yield dataset
+    with django_db_blocker.unblock():
+        transaction.set_rollback(True)
+        seeding.__exit__(None, None, None)
+
+
+@pytest.fixture
+def staff_client(client, dataset):
+    client.force_login(User.objects.get(id=dataset["users"][0]))
+    return client
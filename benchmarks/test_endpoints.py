@@ -0,0 +1,30 @@
+# benchmarks.test_endpoints
+import pytest
+
+pytestmark = pytest.mark.django_db
+
+# Every read endpoint returning a list, through the full middleware stack;
+# {report_id} and {report_ids} are filled in from the synthetic dataset
+LIST_ENDPOINTS = [
+    "/api/reports/?n=50",
+    "/api/reports/query/?n=50&sort=votes",
+    "/api/reports/query/?n=50&status=pending,in_progress&province=Paris",
+    "/api/reports/search/?q=pothole&n=20",
+    "/api/reports/top-pending/?n=50",
+    "/api/reports/by_category/?category_name=Traffic&n=50",
+    "/api/reports/user/",
+    "/api/reports/user/voted/",
+    "/api/reports/user/commented/",
+    "/api/reports/stats/?ids={report_ids}",
+    "/api/reports/{report_id}/comments/",
+    "/api/categories/",
+    "/api/stats/?group_by=day,category",
+    "/api/changes/?limit=200",
+]
+
+
+@pytest.mark.parametrize("url", LIST_ENDPOINTS)
+def test_list_endpoint(benchmark, staff_client, dataset, url):
+    url = url.format(report_id=dataset["reports"][0], report_ids=",".join(map(str, dataset["reports"][:50])))
+    response = benchmark(staff_client.get, url)
+    assert response.status_code == 200
@@ -0,0 +1,24 @@
+# benchmarks.test_nlp
+from core.synthetic import synthetic_texts
+from core.utils import auto_translate, detect_profanity, nlp_categorize
+
+# The models are slow, so each round processes a fixed batch instead of calibrating iterations
+TEXTS = synthetic_texts(10, seed=0)
+ROUNDS = 5
+
+
+def test_nlp_categorize(benchmark):
+    results = benchmark.pedantic(lambda: [nlp_categorize(text) for text in TEXTS], rounds=ROUNDS)
+    assert len(results) == len(TEXTS)
+
+
+def test_detect_profanity(benchmark):
+    results = benchmark.pedantic(lambda: [detect_profanity(text) for text in TEXTS], rounds=ROUNDS)
+    assert all("is_toxic" in result for result in results)
+
+
+def test_auto_translate(benchmark):
+    texts = synthetic_texts(30, seed=1)
+    french = [text for text in texts if text.startswith(("Il ", "Le "))]
+    results = benchmark.pedantic(lambda: [auto_translate(text, "fr", "en") for text in french], rounds=ROUNDS)
+    assert len(results) == len(french)
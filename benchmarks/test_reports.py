@@ -0,0 +1,30 @@
+# benchmarks.test_reports
+import pytest
+
+from core.cities.helper import get_city_info_by_zipcodes, get_zipcode_by_location
+from core.models import Report
+from core.synthetic import PLACES
+from core.utils import build_report_data, with_report_data
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.mark.parametrize("rows", [10, 100, 1000])
+def test_build_report_data(benchmark, dataset, rows):
+    reports = list(with_report_data(Report.objects.order_by("-created_at"))[:rows])
+    data = benchmark(build_report_data, reports)
+    assert len(data) == rows
+
+
+def test_get_zipcode_by_location(benchmark):
+    coordinates = [(lat + 0.002, lon - 0.002) for _, _, _, lat, lon in PLACES]
+
+    def lookup_all():
+        return [get_zipcode_by_location(lat, lon) for lat, lon in coordinates]
+
+    assert all(benchmark(lookup_all))
+
+
+def test_get_city_info_by_zipcodes(benchmark):
+    zipcodes = [zipcode for zipcode, *_ in PLACES]
+    assert len(benchmark(get_city_info_by_zipcodes, zipcodes)) == len(zipcodes)
@@ -1,20 +1,62 @@
+from datetime import datetime, time, timedelta
+
 from allauth.account.models import EmailAddress
 from django import forms
 from django.contrib import admin
 from django.contrib import messages
 from django.contrib.auth.models import Group
 from django.contrib.sites.models import Site
-from django.db.models import Count, Case, When
+from django.core.paginator import Paginator
+from django.db.models import Case, Max, QuerySet, When
+from django.core.exceptions import PermissionDenied
 from django.http import Http404
 from django.shortcuts import render, redirect
 from django.urls import path, reverse
-from django.utils.html import format_html
+from django.utils.dateparse import parse_date
+from django.utils.functional import cached_property
+from django.utils.html import format_html, format_html_join
+from django.utils.timezone import make_aware
 from django.utils.translation import gettext_lazy as _
 
-from core.utils import create_or_update_admin_comment
+from core.images import find_duplicate_reports
+from core.utils import bulk_update_report_status, count_per_report, create_or_update_admin_comment
+from core.querylog import query_log
+from core.stats import query_report_stats
 from core.utils import get_city_info_by_zipcodes
-from .models import Report, AdminComment, ReportTools
-from .models import User, ReportCategory, Vote, Comment
+from .models import Report, AdminComment, ReportTools, ReportStat, StoredImage, QueryStats
+from .models import Admin, User, ReportCategory, Vote, Comment
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that skips COUNT(*) on large unfiltered tables.
+
+    Above `threshold` rows the count of an unfiltered queryset is estimated from MAX(id),
+    which is answered from the primary key index. Filtered querysets are counted exactly.
+    Deleted rows make the estimate too high: a page past the real end falls back to an
+    exact count and is clamped to the last page.
+    """
+    threshold = 10000
+    estimated = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where:
+            estimate = queryset.model._default_manager.aggregate(max_id=Max('pk'))['max_id'] or 0
+            if estimate > self.threshold:
+                self.estimated = True
+                return estimate
+        return super().count
+
+    def page(self, number):
+        page = super().page(number)
+        if self.estimated and page.number > 1 and not page.object_list:
+            self.estimated = False
+            self.__dict__.pop('num_pages', None)
+            self.__dict__['count'] = Paginator.count.func(self)
+            page = super().page(min(page.number, self.num_pages))
+        return page
 
 
 @admin.register(User)
@@ -114,16 +156,19 @@ class ReportAdmin(admin.ModelAdmin):
 
     readonly_fields = [
         'user', 'category', 'title', 'description',
-        'image', 'zipcode', 'city_info', 'latitude', 'longitude', 'created_at'
+        'image', 'duplicate_reports', 'zipcode', 'city_info', 'latitude', 'longitude', 'created_at'
     ]
     fields = (
-        'title', 'user', 'category', 'description', 'image',
+        'title', 'user', 'category', 'description', 'image', 'duplicate_reports',
         'zipcode', 'city_info', 'latitude', 'longitude',
         'status', 'created_at'
     )
 
     def city_info(self, obj):
+        if obj.zipcode and obj.province:
+            return f"{obj.place}, {obj.province} ({obj.zipcode})"
         if obj.zipcode:
+            # Not backfilled yet
             result = get_city_info_by_zipcodes([obj.zipcode])
             if result:
                 info = result[0]
@@ -132,6 +177,18 @@ class ReportAdmin(admin.ModelAdmin):
 
     city_info.short_description = _("City Info")
 
+    def duplicate_reports(self, obj):
+        # Same or near-identical photo, found through the StoredImage hash index
+        duplicates = list(find_duplicate_reports(obj)[:20])
+        if not duplicates:
+            return "-"
+        return format_html_join(
+            ", ", '<a href="{}">#{} {}</a>',
+            ((reverse('admin:core_report_change', args=[r.pk]), r.pk, r.title) for r in duplicates)
+        )
+
+    duplicate_reports.short_description = _("Possible Duplicates")
+
     def get_urls(self):
         urls = super().get_urls()
         custom_urls = [
@@ -176,6 +233,10 @@ class ReportAdmin(admin.ModelAdmin):
 @admin.register(Vote)
 class VoteAdmin(admin.ModelAdmin):
     list_display = ['user', 'report', 'created_at']
+    list_select_related = ['user', 'report']
+    ordering = ['-pk']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     readonly_fields = ['user', 'report', 'created_at']
 
     def has_add_permission(self, request):
@@ -192,10 +253,14 @@ class VoteAdmin(admin.ModelAdmin):
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
     list_display = ['user', 'report_link', 'content', 'created_at']
+    list_select_related = ['user', 'report']
+    ordering = ['-pk']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     readonly_fields = ['user', 'report', 'content', 'created_at']
 
     def report_link(self, obj):
-        url = reverse('admin:core_report_change', args=[obj.report.id])
+        url = reverse('admin:core_report_change', args=[obj.report_id])
         return format_html('<a href="{}">{}</a>', url, obj.report.title)
 
     report_link.short_description = _('Report')
@@ -214,10 +279,14 @@ class CommentAdmin(admin.ModelAdmin):
 @admin.register(AdminComment)
 class AdminCommentAdmin(admin.ModelAdmin):
     list_display = ['admin', 'report_link', 'content', 'created_at']
+    list_select_related = ['admin', 'report']
+    ordering = ['-pk']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     readonly_fields = ['admin', 'report', 'content', 'created_at']
 
     def report_link(self, obj):
-        url = reverse('admin:core_report_change', args=[obj.report.id])
+        url = reverse('admin:core_report_change', args=[obj.report_id])
         return format_html('<a href="{}">{}</a>', url, obj.report.title)
 
     report_link.short_description = _('Report')
@@ -232,44 +301,251 @@ class AdminCommentAdmin(admin.ModelAdmin):
         return False
 
 
-class ZipcodeSearchForm(forms.Form):
-    zipcode = forms.CharField(label="Zipcode", max_length=10)
+class ReportSearchForm(forms.Form):
+    zipcode = forms.CharField(label=_("Zipcode"), max_length=10)
+    status = forms.ChoiceField(label=_("Status"), required=False,
+                               choices=[('', _("All"))] + Report.STATUS_CHOICES)
+    category = forms.ModelChoiceField(label=_("Category"), required=False,
+                                      queryset=ReportCategory.objects.all(), empty_label=_("All"))
+    start = forms.DateField(label=_("From"), required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+    end = forms.DateField(label=_("To"), required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+
+    def clean_zipcode(self):
+        zipcode = self.cleaned_data['zipcode'].strip()
+        if not zipcode.isdigit():
+            raise forms.ValidationError("Invalid zipcode input.")
+        return int(zipcode)
+
+
+class BulkStatusForm(forms.Form):
+    report_ids = forms.TypedMultipleChoiceField(coerce=int, choices=[])
+    status = forms.ChoiceField(label=_("New status"), choices=Report.STATUS_CHOICES)
+    comment = forms.CharField(label=_("Admin Comment"), required=False, widget=forms.Textarea(attrs={'rows': 2}))
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Any posted ID is acceptable here; unknown IDs simply match no report
+        self.fields['report_ids'].valid_value = lambda value: str(value).isdigit()
 
 
 @admin.register(ReportTools)
 class ReportToolAdmin(admin.ModelAdmin):
     change_list_template = "admin/core/reporttools/change_list.html"
+    list_per_page = 50
 
     def has_add_permission(self, request):
         return False
 
-    def changelist_view(self, request, extra_context=None):
-        reports = None
+    def get_urls(self):
+        urls = super().get_urls()
+        custom_urls = [
+            path(
+                'bulk_status/',
+                self.admin_site.admin_view(self.bulk_status),
+                name='core_reporttools_bulk_status'
+            ),
+        ]
+        return custom_urls + urls
 
-        if request.method == 'POST':
-            zipcode = request.POST.get('zipcode', '').strip()
-            if zipcode.isdigit():
-                reports = Report.objects.filter(zipcode=int(zipcode)).annotate(
-                    vote_count=Count('votes')
-                ).annotate(
-                    status_priority=Case(
-                        When(status='pending', then=2),
-                        When(status='in_progress', then=1),
-                        When(status__in=['resolved', 'rejected'], then=0),
-                        default=0
-                    )
-                ).order_by('-vote_count', '-status_priority', '-created_at')
+    def bulk_status(self, request):
+        changelist_url = reverse('admin:core_reporttools_changelist')
+        if request.method != 'POST':
+            return redirect(changelist_url)
+        if not request.user.has_perm('core.change_report'):
+            raise PermissionDenied
+
+        form = BulkStatusForm(request.POST)
+        if not form.is_valid():
+            self.message_user(request, "Select at least one report and a status.", level=messages.ERROR)
+        else:
+            comment = form.cleaned_data['comment'].strip()
+            if comment and not Admin.objects.filter(pk=request.user.id).exists():
+                self.message_user(request, "Only admins can attach a comment.", level=messages.ERROR)
             else:
-                self.message_user(request, "Invalid zipcode input.", level=messages.ERROR)
+                updated = bulk_update_report_status(
+                    form.cleaned_data['report_ids'],
+                    form.cleaned_data['status'],
+                    admin_id=request.user.id,
+                    comment=comment,
+                )
+                messages.success(request, f"✅ {updated} report(s) updated.")
 
+        return redirect(f"{changelist_url}?{request.POST.get('query_string', '')}")
+
+    def changelist_view(self, request, extra_context=None):
+        page = None
+        form = ReportSearchForm(request.GET or None)
+
+        if form.is_bound and form.is_valid():
+            filters = form.cleaned_data
+            reports = Report.objects.filter(zipcode=filters['zipcode'])
+            if filters['status']:
+                reports = reports.filter(status=filters['status'])
+            if filters['category']:
+                reports = reports.filter(category=filters['category'])
+            # Bounds on created_at itself, at local midnight, so the index on it can be used
+            if filters['start']:
+                reports = reports.filter(created_at__gte=make_aware(datetime.combine(filters['start'], time.min)))
+            if filters['end']:
+                end = datetime.combine(filters['end'] + timedelta(days=1), time.min)
+                reports = reports.filter(created_at__lt=make_aware(end))
+
+            reports = reports.select_related('user', 'category').annotate(
+                vote_count=count_per_report(Vote.objects.all())
+            ).annotate(
+                status_priority=Case(
+                    When(status='pending', then=2),
+                    When(status='in_progress', then=1),
+                    When(status__in=['resolved', 'rejected'], then=0),
+                    default=0
+                )
+            ).order_by('-vote_count', '-status_priority', '-created_at')
+
+            page = Paginator(reports, self.list_per_page).get_page(request.GET.get('page'))
+
+            # One batched lookup for the rows of this page that predate stored place/province
+            missing = {r.zipcode for r in page if not r.province}
+            city_map = {int(c['zipcode']): c for c in get_city_info_by_zipcodes(list(missing))}
+            for r in page:
+                info = {'place': r.place, 'province': r.province} if r.province else city_map.get(r.zipcode)
+                r.city_info = f"{info['place']}, {info['province']}" if info else "Unknown"
+        elif form.is_bound:
+            for name, errors in form.errors.items():
+                self.message_user(request, f"{form.fields[name].label}: {' '.join(errors)}", level=messages.ERROR)
+
+        query = request.GET.copy()
+        query.pop('page', None)
         context = {
             **self.admin_site.each_context(request),
-            'reports': reports,
+            'form': form,
+            'page': page,
+            'bulk_form': BulkStatusForm(),
+            'query_string': query.urlencode(),
             'title': 'Custom ReportTools Admin',
         }
         return render(request, self.change_list_template, context)
 
 
+# READONLY
+@admin.register(StoredImage)
+class StoredImageAdmin(admin.ModelAdmin):
+    list_display = ['preview', 'sha256', 'ref_count', 'dhash', 'created_at']
+    readonly_fields = ['preview', 'sha256', 'image', 'thumbnail', 'ref_count', 'dhash', 'created_at']
+    fields = readonly_fields
+    ordering = ['-ref_count', '-pk']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def preview(self, obj):
+        return format_html('<img src="{}" style="max-height: 80px;">', obj.thumbnail.url)
+
+    preview.short_description = _("Preview")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        # Files are released through report deletion only
+        return False
+
+
+@admin.register(ReportStat)
+class ReportStatAdmin(admin.ModelAdmin):
+    change_list_template = "admin/core/reportstat/dashboard.html"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        # Every figure on this page comes from the rollups, never from the Report table
+        try:
+            start = parse_date(request.GET.get('start', '')) or None
+            end = parse_date(request.GET.get('end', '')) or None
+        except ValueError:
+            start = end = None
+            self.message_user(request, "Invalid date range.", level=messages.ERROR)
+
+        def rows(dimension):
+            data = query_report_stats([dimension], start, end)
+            return sorted(
+                ({'key': d[dimension], 'count': d['count']} for d in data),
+                key=lambda row: row['key'] if dimension == 'day' else -row['count'],
+            )
+
+        sections = [
+            {'title': _('By category'), 'label': _('Category'), 'rows': rows('category')},
+            {'title': _('By status'), 'label': _('Status'), 'rows': rows('status')},
+            {'title': _('By province'), 'label': _('Province'), 'rows': rows('province')},
+            {'title': _('By day'), 'label': _('Day'), 'rows': rows('day')},
+        ]
+        context = {
+            **self.admin_site.each_context(request),
+            'sections': sections,
+            'total': sum(row['count'] for row in sections[1]['rows']),
+            'start': start,
+            'end': end,
+            'title': _('Report Statistics'),
+        }
+        return render(request, self.change_list_template, context)
+
+
+QUERY_STATS_ORDERINGS = {
+    'total_ms': _('Total time'),
+    'p99_ms': _('p99'),
+    'p50_ms': _('p50'),
+    'count': _('Count'),
+    'rows': _('Affected rows'),
+}
+
+
+@admin.register(QueryStats)
+class QueryStatsAdmin(admin.ModelAdmin):
+    change_list_template = "admin/core/querystats/change_list.html"
+
+    def has_module_permission(self, request):
+        return request.user.is_staff
+
+    def has_view_permission(self, request, obj=None):
+        return request.user.is_staff
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        if request.method == 'POST' and 'reset' in request.POST:
+            query_log.reset()
+            messages.success(request, "✅ Query statistics reset.")
+            return redirect(reverse('admin:core_querystats_changelist'))
+
+        order = request.GET.get('o', 'total_ms')
+        if order not in QUERY_STATS_ORDERINGS:
+            order = 'total_ms'
+        context = {
+            **self.admin_site.each_context(request),
+            'rows': query_log.top(order_by=order),
+            'order': order,
+            'orderings': QUERY_STATS_ORDERINGS,
+            'slow_ms': query_log.slow_ms,
+            'title': _('Query Statistics'),
+        }
+        return render(request, self.change_list_template, context)
+
+
 admin.site.unregister(Group)
 admin.site.unregister(Site)
 admin.site.unregister(EmailAddress)
@@ -0,0 +1,96 @@
+# core.caching
+import hashlib
+from functools import wraps
+from typing import Dict, Iterable, Optional, Tuple
+
+from asgiref.sync import iscoroutinefunction
+from django.http import HttpRequest
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.utils.translation import get_language
+
+from .models import ResourceVersion
+
+
+def _validators_from_versions(request: HttpRequest, user_pk, versions: Dict) -> Tuple[str, Optional[int]]:
+    parts = [request.get_full_path(), get_language() or "", str(user_pk)]
+    parts += [f"{key}={version}" for key, (version, _) in versions.items()]
+    etag = '"%s"' % hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+    timestamps = [updated_at for _, updated_at in versions.values() if updated_at is not None]
+    last_modified = int(max(timestamps).timestamp()) if timestamps else None
+    return etag, last_modified
+
+
+def resource_validators(request: HttpRequest, keys: Iterable[str]) -> Tuple[str, Optional[int]]:
+    """
+    Build the (ETag, Last-Modified timestamp) pair for a request from resource version counters.
+
+    The ETag also covers the full path, the active language and the current user, because
+    report payloads contain localized dates and per-user results.
+
+    :param request: The HTTP request object.
+    :param keys: Resource version keys the response depends on.
+    :return: A quoted ETag and the last modification time as a UNIX timestamp (or None).
+    """
+    versions = ResourceVersion.snapshot(sorted(set(keys)))
+    return _validators_from_versions(request, request.user.pk, versions)
+
+
+async def aresource_validators(request: HttpRequest, keys: Iterable[str]) -> Tuple[str, Optional[int]]:
+    """
+    Async version of resource_validators(), for async views.
+    """
+    user = await request.auser()
+    versions = await ResourceVersion.asnapshot(sorted(set(keys)))
+    return _validators_from_versions(request, user.pk, versions)
+
+
+def _finalize_response(response, etag: str, last_modified: Optional[int]):
+    if response.status_code in (200, 304):
+        response.headers.setdefault("ETag", etag)
+        if last_modified:
+            response.headers.setdefault("Last-Modified", http_date(last_modified))
+    # Let the browser keep the payload but always revalidate it
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_on(*keys: str):
+    """
+    Decorator answering GET/HEAD requests with 304 when none of the given resources changed.
+
+    Keys may contain URL keyword placeholders, e.g. "votes:{report_id}". The wrapped view is
+    not executed at all for an unchanged resource. Other methods pass straight through.
+    Works on both sync and async views.
+    """
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _wrapped_view(request, *args, **kwargs):
+                if request.method not in ("GET", "HEAD"):
+                    return await view_func(request, *args, **kwargs)
+
+                etag, last_modified = await aresource_validators(request, [key.format(**kwargs) for key in keys])
+                response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                return _finalize_response(response, etag, last_modified)
+
+            return _wrapped_view
+
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view_func(request, *args, **kwargs)
+
+            etag, last_modified = resource_validators(request, [key.format(**kwargs) for key in keys])
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+            return _finalize_response(response, etag, last_modified)
+
+        return _wrapped_view
+
+    return decorator
@@ -0,0 +1,49 @@
+# core.changes
+from typing import Iterable
+
+from django.db import transaction
+from django.db.models import F
+from django.utils.timezone import now
+
+from .models import CHANGES_KEY, ChangeTombstone, Report, ResourceVersion
+
+
+def next_change_seq(*also_bump: str) -> int:
+    """
+    Allocate the next value of the "changes" sequence; call inside the writing transaction.
+    Version keys in `also_bump` are bumped together with it.
+    """
+    return ResourceVersion.allocate(CHANGES_KEY, *also_bump)
+
+
+def allocate_change_seqs(n: int) -> int:
+    """
+    Allocate `n` consecutive values of the "changes" sequence for a bulk insert and return the first.
+    Giving each row its own value lets delta sync clients page through the insert.
+    """
+    first = next_change_seq()
+    if n > 1:
+        ResourceVersion.objects.filter(key=CHANGES_KEY).update(version=F("version") + n - 1)
+    return first
+
+
+def touch_reports(report_ids: Iterable[int], *also_bump: str):
+    """
+    Mark reports as changed without saving them, e.g. after their vote count moved.
+    Version keys in `also_bump` are bumped by the same UPDATE as the "changes" sequence.
+    """
+    report_ids = set(report_ids)
+    if not report_ids:
+        return
+    with transaction.atomic():
+        Report.objects.filter(id__in=report_ids).update(change_seq=next_change_seq(*also_bump), updated_at=now())
+
+
+def record_tombstone(kind: str, object_id: int, report_id: int):
+    """
+    Remember a deleted report or comment for delta sync clients.
+    """
+    with transaction.atomic():
+        ChangeTombstone.objects.create(
+            kind=kind, object_id=object_id, report_id=report_id, change_seq=next_change_seq()
+        )
@@ -3,6 +3,8 @@ import math
 from pathlib import Path
 from typing import Final, List, Dict, Optional
 
+from ..metrics import timed_stage
+
 DB_PATH: Final = Path(__file__).resolve().parent / "cities.sqlite"
 
 def register_math_functions(conn: sqlite3.Connection):
@@ -14,13 +16,16 @@ def register_math_functions(conn: sqlite3.Connection):
     conn.create_function("ASIN", 1, math.asin)
 
 
-def get_zipcode_by_location(lat: float, lon: float, max_km: float = 120.0) -> Optional[int]:
+@timed_stage("geocode")
+def get_city_by_location(lat: float, lon: float, max_km: float = 120.0) -> Optional[Dict[str, object]]:
     """
-    Find the nearest zipcode to a given latitude and longitude.
+    Find the nearest city (zipcode, place, province) to a given latitude and longitude.
     """
     query = """
     SELECT
         zipcode,
+        place,
+        province,
         ROUND(6371 * 2 * ASIN(SQRT(
             POWER(SIN(RADIANS((? - latitude / 10000.0) / 2)), 2) +
             COS(RADIANS(?)) * COS(RADIANS(latitude / 10000.0)) *
@@ -43,9 +48,20 @@ def get_zipcode_by_location(lat: float, lon: float, max_km: float = 120.0) -> Op
         cursor.execute(query, params)
         row = cursor.fetchone()
 
-    return int(row[0]) if row else None
+    if not row:
+        return None
+    return {"zipcode": int(row[0]), "place": row[1], "province": row[2]}
+
+
+def get_zipcode_by_location(lat: float, lon: float, max_km: float = 120.0) -> Optional[int]:
+    """
+    Find the nearest zipcode to a given latitude and longitude.
+    """
+    city = get_city_by_location(lat, lon, max_km)
+    return city["zipcode"] if city else None
 
 
+@timed_stage("zipcode_lookup")
 def get_city_info_by_zipcodes(zipcode_list: List[int]) -> List[Dict[str, str]]:
     """
     Get full city information (zipcode, place, province) for a list of zipcodes.
@@ -0,0 +1,151 @@
+# core.events
+import asyncio
+import json
+import threading
+from collections import deque
+from typing import AsyncIterator, Iterable, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Vote
+
+
+class Subscription:
+    """
+    One connected client: a bounded queue owned by the client's event loop.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue_size: int):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def push(self, event):
+        # Runs on the subscriber's loop; a client too slow to keep up resyncs from scratch
+        if self.queue.full():
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+
+class EventBroker:
+    """
+    In-process publish/subscribe hub for the live feed.
+
+    Write paths publish (id, type, data) events from any thread; every connected SSE client
+    receives them on its own event loop. The last `history` events are kept so a reconnecting
+    client can resume from its Last-Event-ID. Events only reach clients of the same process.
+    """
+
+    def __init__(self, history: int, queue_size: int):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._history = deque(maxlen=history)
+        self._last_id = 0
+        self._queue_size = queue_size
+
+    def publish(self, event_type: str, data: dict):
+        with self._lock:
+            self._last_id += 1
+            event = (self._last_id, event_type, data)
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.push, event)
+            except RuntimeError:
+                # The client's loop is closed
+                self.unsubscribe(subscription)
+
+    def subscribe(self, last_event_id: Optional[int] = None):
+        """
+        Register the calling event loop as a client.
+
+        :param last_event_id: The last event the client received, if it is reconnecting.
+        :return: The subscription and the missed events to replay, or None if the client
+                 missed more than the history holds and must reload everything.
+        """
+        subscription = Subscription(asyncio.get_running_loop(), self._queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+            if last_event_id is None:
+                return subscription, []
+            oldest = self._history[0][0] if self._history else self._last_id + 1
+            if last_event_id > self._last_id or last_event_id < oldest - 1:
+                # Unknown id (e.g. the server restarted) or events already dropped
+                return subscription, None
+            return subscription, [event for event in self._history if event[0] > last_event_id]
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+
+event_broker = EventBroker(history=settings.EVENTS_HISTORY_SIZE, queue_size=settings.EVENTS_QUEUE_SIZE)
+
+
+def publish_on_commit(event_type: str, data: dict):
+    """
+    Publish an event once the current transaction commits, so clients never see rolled back writes.
+    """
+    transaction.on_commit(lambda: event_broker.publish(event_type, data))
+
+
+def publish_vote_counts(report_ids: Iterable[int]):
+    """
+    Publish the current vote count of every given report, read with one grouped query.
+    Nothing is read when no client is connected.
+    """
+    if event_broker.subscriber_count == 0:
+        return
+    report_ids = set(report_ids)
+    counts = dict(
+        Vote.objects.filter(report_id__in=report_ids)
+        .values_list("report_id")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+    for report_id in sorted(report_ids):
+        event_broker.publish("vote", {"report_id": report_id, "vote_count": counts.get(report_id, 0)})
+
+
+def format_event(event_id: Optional[int], event_type: str, data: dict) -> str:
+    lines = [f"event: {event_type}", f"data: {json.dumps(data, separators=(',', ':'))}"]
+    if event_id is not None:
+        lines.insert(0, f"id: {event_id}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def stream_events(last_event_id: Optional[int] = None) -> AsyncIterator[str]:
+    """
+    Yield the SSE wire format for one client until it disconnects.
+    """
+    subscription, backlog = event_broker.subscribe(last_event_id)
+    try:
+        yield f"retry: {settings.EVENTS_RETRY_MS}\n\n"
+        if backlog is None:
+            yield format_event(None, "reset", {})
+        for event in backlog or []:
+            yield format_event(*event)
+
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), settings.EVENTS_HEARTBEAT)
+            except asyncio.TimeoutError:
+                # Comment line, keeps proxies from closing an idle connection
+                yield ": ping\n\n"
+                continue
+            if subscription.overflowed:
+                subscription.overflowed = False
+                yield format_event(None, "reset", {})
+            yield format_event(*event)
+    finally:
+        event_broker.unsubscribe(subscription)
@@ -0,0 +1,124 @@
+# core.executors
+import asyncio
+import contextvars
+import math
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+
+from django.conf import settings
+
+# The spaCy/transformers/Argos models are CPU-bound and do not touch the database.
+# Running them on a small dedicated pool caps how many run at once and keeps them
+# off the event loop and off the thread that serves the async ORM.
+nlp_executor = ThreadPoolExecutor(max_workers=settings.NLP_WORKERS, thread_name_prefix="vdv-nlp")
+
+
+async def run_nlp(func, *args, **kwargs):
+    """
+    Run an NLP helper (detect_profanity, nlp_categorize, auto_translate, ...) on the NLP pool.
+    """
+    loop = asyncio.get_running_loop()
+    # Carry the request context (e.g. its Server-Timing collector) into the pool thread
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(nlp_executor, context.run, partial(func, *args, **kwargs))
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised instead of queueing NLP work the server cannot take right now.
+    """
+
+    def __init__(self, message: str, status: int, retry_after: int):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Per-user rate limit: `burst` submissions at once, refilled at `rate_per_minute`.
+    Only the most recently seen `max_users` users are tracked.
+    """
+
+    def __init__(self, burst: int, rate_per_minute: float, max_users: int = 10000):
+        self.burst = burst
+        self.rate = rate_per_minute / 60.0
+        self.max_users = max_users
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, user_id) -> float:
+        """
+        Take one token; return 0 on success, else the seconds until a token is available.
+        """
+        current = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(user_id, (self.burst, current))
+            tokens = min(self.burst, tokens + (current - last) * self.rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+            if not wait:
+                tokens -= 1
+            self._buckets[user_id] = (tokens, current)
+            if len(self._buckets) > self.max_users:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def refund(self, user_id):
+        """
+        Give back a token taken for a submission that was not admitted after all.
+        """
+        with self._lock:
+            if user_id in self._buckets:
+                tokens, last = self._buckets[user_id]
+                self._buckets[user_id] = (min(self.burst, tokens + 1), last)
+
+
+class AdmissionGate:
+    """
+    Bounded concurrency gate for the NLP stages of a request.
+
+    At most `workers + queue_size` requests are admitted at once, so a surge is answered
+    with fast 503s instead of piling up behind the models. Retry-After is estimated from
+    the recent time requests spend inside the gate.
+    """
+
+    def __init__(self, workers: int, queue_size: int, user_limit: TokenBucket):
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self.user_limit = user_limit
+        self.in_flight = 0
+        self._avg_seconds = 1.0
+        self._lock = threading.Lock()
+
+    @asynccontextmanager
+    async def admit(self, user_id):
+        wait = self.user_limit.take(user_id)
+        if wait:
+            raise AdmissionRejected("Too many submissions, please slow down.", 429, math.ceil(wait))
+
+        with self._lock:
+            if self.in_flight >= self.capacity:
+                retry_after = math.ceil(self._avg_seconds * self.in_flight / self.workers)
+                # A shed submission must not count against the user's rate limit
+                self.user_limit.refund(user_id)
+                raise AdmissionRejected("The server is busy, please retry shortly.", 503, max(retry_after, 1))
+            self.in_flight += 1
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * (time.monotonic() - started)
+
+
+nlp_gate = AdmissionGate(
+    workers=settings.NLP_WORKERS,
+    queue_size=settings.NLP_QUEUE_SIZE,
+    user_limit=TokenBucket(settings.NLP_USER_BURST, settings.NLP_USER_RATE_PER_MINUTE),
+)
@@ -0,0 +1,147 @@
+# core.export
+import csv
+import json
+from itertools import islice
+from typing import AsyncIterator, Dict, Iterator, List
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import F
+
+from .cities.helper import get_city_info_by_zipcodes
+from .models import Report, Vote
+from .utils import count_per_report
+
+EXPORT_FIELDS = [
+    "id", "title", "description", "status", "category", "vote_count",
+    "zipcode", "place", "province", "latitude", "longitude", "image_url", "created_at",
+]
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _report_rows():
+    return (
+        Report.objects.order_by("id")
+        .annotate(vote_count=count_per_report(Vote.objects.all()), category_name=F("category__name"))
+        .values("id", "title", "description", "status", "category_name", "vote_count",
+                "zipcode", "place", "province", "latitude", "longitude", "image", "created_at")
+    )
+
+
+def _missing_zipcodes(batch: List[dict], places: Dict[int, dict]) -> List[int]:
+    # Rows created before place/province were stored, and not backfilled yet
+    return list({row["zipcode"] for row in batch if row["zipcode"] is not None and not row["province"]} - places.keys())
+
+
+def _add_places(places: Dict[int, dict], zipcodes: List[int]):
+    if not zipcodes:
+        return
+    found = {int(item["zipcode"]): item for item in get_city_info_by_zipcodes(zipcodes)}
+    for zipcode in zipcodes:
+        places[zipcode] = found.get(zipcode, {"place": "", "province": ""})
+
+
+def _export_row(row: dict, places: Dict[int, dict]) -> Dict[str, object]:
+    place, province = row["place"], row["province"]
+    if row["zipcode"] is not None and not province:
+        place, province = places[row["zipcode"]]["place"], places[row["zipcode"]]["province"]
+    return {
+        "id": row["id"],
+        "title": row["title"],
+        "description": row["description"],
+        "status": row["status"],
+        "category": row["category_name"],
+        "vote_count": row["vote_count"],
+        "zipcode": row["zipcode"],
+        "place": place,
+        "province": province,
+        "latitude": row["latitude"],
+        "longitude": row["longitude"],
+        "image_url": f"{settings.MEDIA_URL}{row['image']}" if row["image"] else None,
+        "created_at": row["created_at"].isoformat(),
+    }
+
+
+def iter_report_rows(chunk_size: int = 2000) -> Iterator[Dict[str, object]]:
+    """
+    Yield every report as a flat dictionary, reading the table in chunks so memory stays flat.
+    Personal data (user name and email) is not part of the export. Place and province of rows
+    not backfilled yet are looked up in the cities database, once per chunk.
+
+    :param chunk_size: The number of rows fetched from the database at a time.
+    """
+    rows = _report_rows().iterator(chunk_size=chunk_size)
+    places = {}
+    while batch := list(islice(rows, chunk_size)):
+        _add_places(places, _missing_zipcodes(batch, places))
+        for row in batch:
+            yield _export_row(row, places)
+
+
+async def aiter_report_rows(chunk_size: int = 2000) -> AsyncIterator[Dict[str, object]]:
+    """
+    Async version of iter_report_rows(), so an ASGI server can stream the export
+    instead of collecting a sync iterator in memory first.
+    """
+    places = {}
+    batch = []
+    async for row in _report_rows().aiterator(chunk_size=chunk_size):
+        batch.append(row)
+        if len(batch) == chunk_size:
+            await sync_to_async(_add_places)(places, _missing_zipcodes(batch, places))
+            for item in batch:
+                yield _export_row(item, places)
+            batch = []
+    await sync_to_async(_add_places)(places, _missing_zipcodes(batch, places))
+    for item in batch:
+        yield _export_row(item, places)
+
+
+class _Echo:
+    """
+    File-like object whose write() returns the value, so csv.writer can feed a generator.
+    """
+
+    def write(self, value):
+        return value
+
+
+def _line_writer(export_format: str):
+    """
+    Return the header line (or None) and a function turning a row into one line.
+    """
+    if export_format == "ndjson":
+        return None, lambda row: json.dumps(row, ensure_ascii=False) + "\n"
+    if export_format == "csv":
+        writer = csv.DictWriter(_Echo(), fieldnames=EXPORT_FIELDS)
+        return writer.writeheader(), writer.writerow
+    raise ValueError(f"Unknown export format '{export_format}'")
+
+
+def iter_export_lines(export_format: str, chunk_size: int = 2000) -> Iterator[str]:
+    """
+    Serialize every report as NDJSON lines or CSV rows (with a header), one line at a time.
+
+    :param export_format: "ndjson" or "csv".
+    :param chunk_size: The number of rows fetched from the database at a time.
+    """
+    header, write = _line_writer(export_format)
+    if header is not None:
+        yield header
+    for row in iter_report_rows(chunk_size):
+        yield write(row)
+
+
+async def aiter_export_lines(export_format: str, chunk_size: int = 2000) -> AsyncIterator[str]:
+    """
+    Async version of iter_export_lines(), for responses served over ASGI.
+    """
+    header, write = _line_writer(export_format)
+    if header is not None:
+        yield header
+    async for row in aiter_report_rows(chunk_size):
+        yield write(row)
@@ -0,0 +1,188 @@
+# core.images
+import hashlib
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, Q
+from PIL import Image, ImageOps
+
+from .models import Report, StoredImage
+
+logger = logging.getLogger(__name__)
+
+IMAGE_MAX_SIZE = (1600, 1600)
+THUMBNAIL_SIZE = (320, 320)
+WEBP_QUALITY = 80
+
+# Near-duplicate threshold; with 4 bands, any pair within 3 bits shares a band
+DHASH_BANDS = 4
+DHASH_MAX_DISTANCE = 3
+
+_executor = ThreadPoolExecutor(max_workers=settings.IMAGE_WORKERS, thread_name_prefix="vdv-image")
+
+
+def encode_webp(image: Image.Image, max_size) -> bytes:
+    """
+    Downscale an image to fit in `max_size` and encode it as WebP.
+    Metadata is not carried over, which strips EXIF (including GPS tags).
+    """
+    image = image.copy()
+    image.thumbnail(max_size, Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    image.save(buffer, format="WEBP", quality=WEBP_QUALITY, method=4)
+    return buffer.getvalue()
+
+
+def compute_dhash(image: Image.Image) -> int:
+    """
+    64-bit difference hash: compare horizontally adjacent pixels of a 9x8 grayscale version.
+    """
+    pixels = list(image.convert("L").resize((9, 8), Image.Resampling.LANCZOS).getdata())
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            value = (value << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return value
+
+
+def dhash_bands(value: int) -> List[int]:
+    return [(value >> (16 * i)) & 0xFFFF for i in range(DHASH_BANDS)]
+
+
+def normalize_image(data: bytes):
+    """
+    Turn uploaded JPEG/PNG bytes into a (full size WebP, thumbnail WebP, dhash) triple.
+    """
+    with Image.open(io.BytesIO(data)) as source:
+        # Apply the EXIF orientation before the EXIF block is dropped
+        image = ImageOps.exif_transpose(source)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+        return encode_webp(image, IMAGE_MAX_SIZE), encode_webp(image, THUMBNAIL_SIZE), compute_dhash(image)
+
+
+def _store_file(name: str, content: bytes):
+    # Content-addressed: an existing file under this name already holds these bytes
+    if not default_storage.exists(name):
+        saved = default_storage.save(name, ContentFile(content))
+        if saved != name:
+            # Lost a race with another worker storing the same content
+            default_storage.delete(saved)
+
+
+def acquire_stored_image(full: bytes, thumbnail: bytes, dhash: int) -> StoredImage:
+    """
+    Return the StoredImage for these bytes, storing the files if they are new,
+    and take one reference on it. Must be called inside a transaction.
+    """
+    sha256 = hashlib.sha256(full).hexdigest()
+    image_name = f"report_images/{sha256[:2]}/{sha256}.webp"
+    thumbnail_name = f"report_thumbnails/{sha256[:2]}/{sha256}.webp"
+    _store_file(image_name, full)
+    _store_file(thumbnail_name, thumbnail)
+
+    bands = dhash_bands(dhash)
+    stored, _ = StoredImage.objects.get_or_create(
+        sha256=sha256,
+        defaults={
+            "image": image_name,
+            "thumbnail": thumbnail_name,
+            "dhash": f"{dhash:016x}",
+            **{f"dhash_band{i}": band for i, band in enumerate(bands)},
+        },
+    )
+    StoredImage.objects.filter(pk=stored.pk).update(ref_count=F("ref_count") + 1)
+    return stored
+
+
+def release_stored_image(stored_image_id: int):
+    """
+    Drop one reference; the row and its files are deleted with the last reference.
+    The files are removed once the enclosing transaction commits, so a rollback keeps them.
+    """
+    with transaction.atomic():
+        StoredImage.objects.filter(pk=stored_image_id).update(ref_count=F("ref_count") - 1)
+        stored = StoredImage.objects.filter(pk=stored_image_id, ref_count=0).first()
+        if stored is None:
+            return
+        names = [name for name in (stored.image.name, stored.thumbnail.name) if name]
+        stored.delete()
+        transaction.on_commit(lambda: [default_storage.delete(name) for name in names])
+
+
+def process_report_image(report_id: int) -> bool:
+    """
+    Replace a report's uploaded image with its normalized, content-addressed WebP version.
+
+    :param report_id: The ID of the report.
+    :return: True if the image was processed, False if there was nothing to do.
+    """
+    report = Report.objects.filter(pk=report_id).first()
+    if report is None or not report.image or report.stored_image_id:
+        return False
+
+    original = report.image.name
+    with report.image.open("rb") as f:
+        full, thumbnail, dhash = normalize_image(f.read())
+
+    with transaction.atomic():
+        stored = acquire_stored_image(full, thumbnail, dhash)
+        report.stored_image = stored
+        report.image.name = stored.image.name
+        report.thumbnail.name = stored.thumbnail.name
+        report.save(update_fields=["stored_image", "image", "thumbnail"])
+
+    if original != report.image.name:
+        default_storage.delete(original)
+    return True
+
+
+def find_similar_images(stored_image: StoredImage, max_distance: int = DHASH_MAX_DISTANCE) -> List[StoredImage]:
+    """
+    Other stored images whose perceptual hash is within `max_distance` bits of this one.
+    Candidates come from the indexed band columns; the exact distance is checked in Python.
+    """
+    if max_distance >= DHASH_BANDS:
+        raise ValueError(f"max_distance must be below {DHASH_BANDS} for the band index to be exact")
+
+    target = int(stored_image.dhash, 16)
+    band_match = Q()
+    for i, band in enumerate(dhash_bands(target)):
+        band_match |= Q(**{f"dhash_band{i}": band})
+    candidates = StoredImage.objects.filter(band_match).exclude(pk=stored_image.pk)
+    return [c for c in candidates if (int(c.dhash, 16) ^ target).bit_count() <= max_distance]
+
+
+def find_duplicate_reports(report: Report):
+    """
+    Other reports sharing this report's image or a near-identical one.
+    """
+    if not report.stored_image_id:
+        return Report.objects.none()
+    image_ids = [report.stored_image_id] + [s.pk for s in find_similar_images(report.stored_image)]
+    return Report.objects.filter(stored_image_id__in=image_ids).exclude(pk=report.pk).order_by("-created_at")
+
+
+def _process_in_background(report_id: int):
+    close_old_connections()
+    try:
+        process_report_image(report_id)
+    except Exception:
+        # The original upload stays in place and can be retried with process_report_images
+        logger.exception("Image processing failed for report %s", report_id)
+    finally:
+        connection.close()
+
+
+def schedule_report_image_processing(report_id: int):
+    """
+    Process a report's image on the image worker pool once the current transaction commits,
+    keeping decoding and re-encoding off the request path.
+    """
+    transaction.on_commit(lambda: _executor.submit(_process_in_background, report_id))
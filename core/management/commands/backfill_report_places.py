@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.timezone import now
+
+from core.changes import next_change_seq
+from core.cities.helper import get_city_info_by_zipcodes
+from core.models import Report, ResourceVersion
+
+
+class Command(BaseCommand):
+    help = "Fill Report.place/province from the cities database for reports that predate denormalization"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Zipcodes looked up per query")
+
+    def handle(self, *args, **options):
+        zipcodes = list(
+            Report.objects.filter(province="", zipcode__isnull=False)
+            .values_list("zipcode", flat=True)
+            .distinct()
+        )
+        self.stdout.write(f"🗺️ {len(zipcodes)} zipcodes to backfill...")
+
+        updated = 0
+        batch_size = options["batch_size"]
+        for i in range(0, len(zipcodes), batch_size):
+            infos = get_city_info_by_zipcodes(zipcodes[i:i + batch_size])
+            if not infos:
+                continue
+            with transaction.atomic():
+                # queryset.update() skips change tracking: one sequence value per batch for delta sync clients
+                change_seq = next_change_seq()
+                for info in infos:
+                    updated += Report.objects.filter(zipcode=int(info["zipcode"]), province="").update(
+                        place=info["place"], province=info["province"], change_seq=change_seq, updated_at=now()
+                    )
+
+        if updated:
+            ResourceVersion.bump("reports")  # queryset.update() does not send signals
+        self.stdout.write(f"✅ {updated} reports backfilled.")
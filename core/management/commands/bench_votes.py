@@ -0,0 +1,94 @@
+# core/management/commands/bench_votes.py
+import threading
+import time
+import uuid
+
+from django.db import OperationalError, connection
+from django.core.management.base import BaseCommand
+
+from core.models import User, Report, Vote
+from core.utils import create_vote
+from core.vote_buffer import VoteBuffer
+
+
+class Command(BaseCommand):
+    help = "Benchmark sustained vote ingestion on one viral report: direct get_or_create vs. write-behind buffer"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--votes", type=int, default=5000, help="Number of distinct voters")
+        parser.add_argument("--threads", type=int, default=16, help="Concurrent request threads")
+        parser.add_argument("--mode", choices=["direct", "buffered", "both"], default="both")
+        parser.add_argument("--keep", action="store_true", help="Keep the benchmark users, report and votes")
+
+    def handle(self, *args, **options):
+        suffix = uuid.uuid4().hex[:6]
+        # "testuser" prefix so clear_dev_data also removes leftovers of an aborted run
+        owner = User.objects.create_user(f"testuser_bench_{suffix}", f"testuser_bench_{suffix}@example.com")
+        User.objects.bulk_create([
+            User(username=f"testuser_bench_{suffix}_{i}", email=f"testuser_bench_{suffix}_{i}@example.com")
+            for i in range(options["votes"])
+        ], batch_size=1000)
+        voter_ids = list(
+            User.objects.filter(username__startswith=f"testuser_bench_{suffix}_").values_list("id", flat=True)
+        )
+        self.stdout.write(f"🗳️ {len(voter_ids)} voters, {options['threads']} threads")
+
+        try:
+            if options["mode"] in ("direct", "both"):
+                self._bench(owner, voter_ids, options["threads"], "direct")
+            if options["mode"] in ("buffered", "both"):
+                self._bench(owner, voter_ids, options["threads"], "buffered")
+        finally:
+            if not options["keep"]:
+                User.objects.filter(username__startswith=f"testuser_bench_{suffix}").delete()
+
+    def _bench(self, owner, voter_ids, n_threads, mode):
+        report = Report.objects.create(
+            user=owner, title=f"Vote benchmark ({mode})", description="Synthetic viral report",
+            latitude=48.853, longitude=2.349,
+        )
+        buffer = VoteBuffer() if mode == "buffered" else None
+        errors = []
+        latencies = []
+        lock = threading.Lock()
+
+        def worker(chunk):
+            local_latencies, local_errors = [], 0
+            try:
+                for user_id in chunk:
+                    start = time.perf_counter()
+                    try:
+                        if buffer is not None:
+                            buffer.submit(user_id, report.id)
+                        else:
+                            create_vote(user_id=user_id, report_id=report.id)
+                    except OperationalError:  # "database is locked"
+                        local_errors += 1
+                    local_latencies.append(time.perf_counter() - start)
+            finally:
+                connection.close()
+                with lock:
+                    latencies.extend(local_latencies)
+                    errors.append(local_errors)
+
+        chunks = [voter_ids[i::n_threads] for i in range(n_threads)]
+        threads = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        accepted = time.perf_counter() - start
+        if buffer is not None:
+            buffer.stop()  # Drain everything that is still pending
+        elapsed = time.perf_counter() - start
+
+        stored = Vote.objects.filter(report=report).count()
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0
+        self.stdout.write(
+            f"[{mode}] stored {stored}/{len(voter_ids)} votes in {elapsed:.2f}s "
+            f"→ {stored / elapsed:.0f} votes/s sustained "
+            f"(accepted in {accepted:.2f}s, p99 request {p99:.1f} ms, {sum(errors)} lock errors)"
+        )
@@ -4,7 +4,7 @@ from datetime import timedelta
 from django.core.management.base import BaseCommand
 from django.utils.timezone import now
 from core.models import User, Admin, ReportCategory, Report, Comment, Vote
-from core.cities.helper import get_zipcode_by_location
+from core.cities.helper import get_city_by_location
 import uuid
 
 # Create categories
@@ -96,7 +96,7 @@ class Command(BaseCommand):
 
         for i in range(len(report_titles)):
             lat, lon = generate_paris_area_coords()
-            zipcode = get_zipcode_by_location(lat, lon)
+            city = get_city_by_location(lat, lon) or {}
             category_data = nlp_categorize(report_descs[i])
             if category_data:
                 category, _ = ReportCategory.objects.get_or_create(
@@ -116,7 +116,9 @@ class Command(BaseCommand):
                 category=category,
                 latitude=lat,
                 longitude=lon,
-                zipcode=zipcode,
+                zipcode=city.get("zipcode"),
+                place=city.get("place", ""),
+                province=city.get("province", ""),
                 created_at=now() - timedelta(days=random.randint(0, 5))
             )
 
@@ -142,7 +144,7 @@ class Command(BaseCommand):
         admin2_desc = "Water is continuously leaking from a fire hydrant. It might be a hazard."
 
         lat, lon = generate_paris_area_coords()
-        zipcode = get_zipcode_by_location(lat, lon)
+        city = get_city_by_location(lat, lon) or {}
         category_data = nlp_categorize(admin2_desc)
         if category_data:
             category = category_objs.get(category_data["name"], category_objs["other"])
@@ -156,7 +158,9 @@ class Command(BaseCommand):
             category=category,
             latitude=lat,
             longitude=lon,
-            zipcode=zipcode,
+            zipcode=city.get("zipcode"),
+            place=city.get("place", ""),
+            province=city.get("province", ""),
             created_at=now() - timedelta(days=random.randint(0, 5))
         )
 
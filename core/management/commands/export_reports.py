@@ -0,0 +1,24 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from core.export import EXPORT_FORMATS, iter_export_lines
+
+
+class Command(BaseCommand):
+    help = "Stream every report as NDJSON or CSV open data (to a file or stdout)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="ndjson")
+        parser.add_argument("--output", help="Destination file (default: stdout)")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Rows fetched per database round-trip")
+
+    def handle(self, *args, **options):
+        lines = iter_export_lines(options["format"], options["chunk_size"])
+        if not options["output"]:
+            sys.stdout.writelines(lines)
+            return
+
+        with open(options["output"], "w", encoding="utf-8", newline="") as f:
+            f.writelines(lines)
+        self.stderr.write(f"✅ Reports exported to {options['output']}")
@@ -0,0 +1,252 @@
+# core/management/commands/http_load_test.py
+import io
+import json
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, Request, build_opener
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image
+
+from core.models import Report, User
+
+# Relative frequency of each user flow
+FLOWS = {"browse": 5, "vote": 3, "comment": 2, "report": 1, "report_image": 1}
+
+# Responses telling the client to back off (admission control), counted apart from errors
+SHED_STATUSES = (429, 503)
+
+DESCRIPTIONS = [
+    "There is a huge pothole on the road near the bus stop.",
+    "Trash bins have not been emptied for a week, the smell is terrible.",
+    "The traffic light at the intersection keeps blinking.",
+    "Street lighting is out on the whole block since Monday.",
+]
+
+
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def _sample_jpeg() -> bytes:
+    """
+    A photo-sized JPEG, so uploads go through the full image pipeline.
+    """
+    image = Image.effect_mandelbrot((1600, 1200), (-2.0, -1.2, 1.0, 1.2), 60).convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def _multipart(fields, files):
+    boundary = uuid.uuid4().hex
+    body = io.BytesIO()
+    for name, value in fields.items():
+        body.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, (filename, content_type, content) in files.items():
+        body.write(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n".encode()
+        )
+        body.write(content + b"\r\n")
+    body.write(f"--{boundary}--\r\n".encode())
+    return body.getvalue(), f"multipart/form-data; boundary={boundary}"
+
+
+class VirtualUser:
+    """
+    One browser session: logs in through the allauth form, then runs weighted user flows.
+    Every request is recorded as (latency, status) under a label naming the endpoint.
+    """
+
+    def __init__(self, base_url, username, password, report_ids, image, rng):
+        self.base_url = base_url.rstrip("/")
+        self.username = username
+        self.password = password
+        self.report_ids = report_ids
+        self.image = image
+        self.rng = rng
+        self.cookies = CookieJar()
+        self.opener = build_opener(HTTPCookieProcessor(self.cookies))
+        self.samples = defaultdict(list)
+
+    def request(self, label, path, data=None, content_type=None):
+        request = Request(self.base_url + path, data=data, method="POST" if data is not None else "GET")
+        if content_type:
+            request.add_header("Content-Type", content_type)
+        start = time.perf_counter()
+        try:
+            with self.opener.open(request, timeout=60) as response:
+                body, status = response.read(), response.status
+        except HTTPError as e:
+            body, status = e.read(), e.code
+        except (URLError, OSError):
+            body, status = b"", 0
+        self.samples[label].append((time.perf_counter() - start, status))
+        return status, body
+
+    def _json(self, label, path, payload):
+        return self.request(label, path, json.dumps(payload).encode(), "application/json")
+
+    def login(self) -> bool:
+        self.request("GET /accounts/login/", "/accounts/login/")
+        csrf = next((c.value for c in self.cookies if c.name == "csrftoken"), "")
+        form = urlencode({"login": self.username, "password": self.password, "csrfmiddlewaretoken": csrf})
+        # Follows the redirect to the home page
+        status, _ = self.request("POST /accounts/login/", "/accounts/login/", form.encode(),
+                                 "application/x-www-form-urlencoded")
+        return any(c.name == "sessionid" for c in self.cookies) and status == 200
+
+    def browse(self):
+        # What the home page loads
+        self.request("GET /", "/")
+        self.request("GET /api/categories/", "/api/categories/")
+        status, body = self.request("GET /api/reports/query/", "/api/reports/query/?n=10&sort=new")
+        ids = [r["id"] for r in json.loads(body).get("reports", [])] if status == 200 else []
+        if ids:
+            self.request("GET /api/reports/stats/", f"/api/reports/stats/?ids={','.join(map(str, ids))}")
+        for path in ("/api/reports/user/", "/api/reports/user/voted/", "/api/reports/user/commented/"):
+            self.request(f"GET {path}", path)
+
+    def vote(self):
+        self._json("POST /api/votes/", "/api/votes/", {"report_id": self.rng.choice(self.report_ids)})
+
+    def comment(self):
+        report_id = self.rng.choice(self.report_ids)
+        self.request("GET /api/reports/<id>/comments/", f"/api/reports/{report_id}/comments/")
+        self._json("POST /api/reports/<id>/comments/", f"/api/reports/{report_id}/comments/",
+                   {"content": self.rng.choice(DESCRIPTIONS)})
+
+    def report(self, with_image=False):
+        description = self.rng.choice(DESCRIPTIONS)
+        data = {
+            "title": description[:40],
+            "description": description,
+            "latitude": 48.853 + self.rng.uniform(-0.05, 0.05),
+            "longitude": 2.349 + self.rng.uniform(-0.05, 0.05),
+        }
+        files = {"image": ("photo.jpg", "image/jpeg", self.image)} if with_image else {}
+        body, content_type = _multipart({"data": json.dumps(data)}, files)
+        label = "POST /api/reports/ (image)" if with_image else "POST /api/reports/"
+        self.request(label, "/api/reports/", body, content_type)
+
+    def run(self, deadline, think_time):
+        flows, weights = zip(*FLOWS.items())
+        while time.monotonic() < deadline:
+            flow = self.rng.choices(flows, weights)[0]
+            if flow == "browse":
+                self.browse()
+            elif flow == "vote":
+                self.vote()
+            elif flow == "comment":
+                self.comment()
+            else:
+                self.report(with_image=flow == "report_image")
+            if think_time:
+                time.sleep(self.rng.uniform(0, 2 * think_time))
+
+
+class Command(BaseCommand):
+    help = "HTTP load test of a running server with realistic user flows: login, browse, vote, comment, report"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of the server under test")
+        parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+        parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load after ramp-up")
+        parser.add_argument("--ramp-up", type=float, default=5.0, help="Seconds over which users start")
+        parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between flows, seconds")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--keep", action="store_true", help="Keep the load test users and what they created")
+
+    def handle(self, *args, **options):
+        suffix = uuid.uuid4().hex[:6]
+        password = uuid.uuid4().hex
+        # "testuser" prefix so clear_dev_data also removes leftovers of an aborted run
+        prefix = f"testuser_http_{suffix}_"
+        hashed = make_password(password)
+        User.objects.bulk_create([
+            User(username=f"{prefix}{i}", email=f"{prefix}{i}@example.com", password=hashed)
+            for i in range(options["users"])
+        ])
+
+        report_ids = list(Report.objects.order_by("-id").values_list("id", flat=True)[:500])
+        if not report_ids:
+            # Imported here: core.synthetic loads the NLP models (unless VDV_NLP_STUBS=1)
+            from core.synthetic import generate_dataset
+            report_ids = generate_dataset(200, seed=options["seed"])["reports"]
+
+        image = _sample_jpeg()
+        virtual_users = [
+            VirtualUser(options["url"], f"{prefix}{i}", password, report_ids, image, random.Random(options["seed"] + i))
+            for i in range(options["users"])
+        ]
+        self.stdout.write(f"🚦 {options['users']} users against {options['url']} for {options['duration']:.0f}s...")
+
+        try:
+            if not virtual_users[0].login():
+                raise CommandError(f"Could not log in at {options['url']}/accounts/login/; is the server running?")
+            elapsed = self._run(virtual_users, options)
+            self._report(virtual_users, elapsed)
+        finally:
+            if not options["keep"]:
+                User.objects.filter(username__startswith=prefix).delete()
+
+    def _run(self, virtual_users, options):
+        start = time.monotonic()
+        deadline = start + options["ramp_up"] + options["duration"]
+
+        def session(index, user):
+            time.sleep(options["ramp_up"] * index / len(virtual_users))
+            if index == 0 or user.login():
+                user.run(deadline, options["think_time"])
+
+        threads = [
+            threading.Thread(target=session, args=(i, user), daemon=True) for i, user in enumerate(virtual_users)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.monotonic() - start
+
+    def _report(self, virtual_users, elapsed):
+        samples = defaultdict(list)
+        for user in virtual_users:
+            for label, values in user.samples.items():
+                samples[label].extend(values)
+
+        self.stdout.write(
+            f"\n{'endpoint':<36}{'requests':>9}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'shed':>6}{'errors':>7}"
+        )
+        total = errors = 0
+        for label in sorted(samples):
+            values = samples[label]
+            latencies = sorted(latency for latency, _ in values)
+            shed = sum(status in SHED_STATUSES for _, status in values)
+            failed = sum(not 200 <= status < 400 and status not in SHED_STATUSES for _, status in values)
+            self.stdout.write(
+                f"{label:<36}{len(values):>9}{len(values) / elapsed:>8.1f}"
+                f"{_percentile(latencies, 0.50) * 1000:>9.1f}{_percentile(latencies, 0.95) * 1000:>9.1f}"
+                f"{_percentile(latencies, 0.99) * 1000:>9.1f}{shed:>6}{failed:>7}"
+            )
+            total += len(values)
+            errors += failed
+        self.stdout.write(f"{'total':<36}{total:>9}{total / elapsed:>8.1f}{'':>33}{errors:>7}")
+        self.stdout.write(f"Failing statuses: {self._status_summary(samples)}" if errors else "✅ No errors.")
+
+    @staticmethod
+    def _status_summary(samples) -> str:
+        counts = defaultdict(int)
+        for values in samples.values():
+            for _, status in values:
+                if not 200 <= status < 400 and status not in SHED_STATUSES:
+                    counts[status] += 1
+        return ", ".join(f"{status or 'connection error'}: {n}" for status, n in sorted(counts.items()))
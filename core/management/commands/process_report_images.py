@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from core.images import process_report_image
+from core.models import Report
+
+
+class Command(BaseCommand):
+    help = "Re-encode report images to WebP and move them into content-addressed storage"
+
+    def handle(self, *args, **options):
+        report_ids = list(
+            Report.objects.exclude(Q(image="") | Q(image__isnull=True))
+            .filter(stored_image__isnull=True)
+            .values_list("id", flat=True)
+        )
+        self.stdout.write(f"🖼️ {len(report_ids)} images to process...")
+
+        processed = failed = 0
+        for report_id in report_ids:
+            try:
+                processed += process_report_image(report_id)
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"⚠️ Report {report_id}: {e}")
+
+        self.stdout.write(f"✅ {processed} images processed, {failed} failed.")
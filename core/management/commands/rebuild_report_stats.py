@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from core.stats import rebuild_report_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the report statistics rollups from scratch"
+
+    def handle(self, *args, **options):
+        self.stdout.write("📈 Rebuilding report statistics...")
+        buckets = rebuild_report_stats()
+        self.stdout.write(f"✅ {buckets} statistics buckets written.")
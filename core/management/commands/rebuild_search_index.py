@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from core.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild and optimize the FTS5 report search index"
+
+    def handle(self, *args, **options):
+        self.stdout.write("🔎 Rebuilding report search index...")
+        rebuild_search_index()
+        self.stdout.write("✅ Search index rebuilt.")
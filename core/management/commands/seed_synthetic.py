@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from core.synthetic import generate_dataset
+
+
+class Command(BaseCommand):
+    help = "Create a reproducible synthetic dataset (users, reports, votes, comments) for benchmarks and load tests"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reports", type=int, default=1000, help="Number of reports")
+        parser.add_argument("--users", type=int, default=20, help="Number of synthetic users")
+        parser.add_argument("--seed", type=int, default=0, help="The same seed always yields the same content")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"🎲 Generating {options['reports']} reports (seed {options['seed']})...")
+        dataset = generate_dataset(options["reports"], seed=options["seed"], users=options["users"])
+        self.stdout.write(
+            f"✅ {len(dataset['reports'])} reports created for {len(dataset['users'])} users; "
+            "remove them with clear_dev_data."
+        )
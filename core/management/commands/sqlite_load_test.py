@@ -0,0 +1,134 @@
+# core/management/commands/sqlite_load_test.py
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+N_USERS = 200
+N_REPORTS = 50
+
+
+def _bootstrap(env):
+    """
+    Configure Django inside a spawned process against the load test database.
+    """
+    os.environ.update(env)
+    import django
+    django.setup()
+
+
+def _prepare_database(env):
+    _bootstrap(env)
+    from django.core.management import call_command
+    from core.models import Report, User
+
+    call_command("migrate", verbosity=0)
+    User.objects.bulk_create([
+        User(username=f"testuser_load_{i}", email=f"testuser_load_{i}@example.com") for i in range(N_USERS)
+    ])
+    owner = User.objects.first()
+    Report.objects.bulk_create([
+        Report(user=owner, title=f"Load test report {i}", description="Synthetic report",
+               latitude=48.853, longitude=2.349)
+        for i in range(N_REPORTS)
+    ])
+
+
+def _worker(env, seed, duration, read_ratio, results):
+    _bootstrap(env)
+    from django.db import OperationalError, transaction
+    from django.db.models import Count
+    from core.models import Comment, Report, User, Vote
+
+    rng = random.Random(seed)
+    user_ids = list(User.objects.values_list("id", flat=True))
+    report_ids = list(Report.objects.values_list("id", flat=True))
+    stats = {kind: {"ok": 0, "locked": 0, "latencies": []} for kind in ("read", "report", "vote", "comment")}
+
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        user_id, report_id = rng.choice(user_ids), rng.choice(report_ids)
+        kind = "read" if rng.random() < read_ratio else rng.choice(["report", "vote", "comment"])
+        start = time.perf_counter()
+        try:
+            if kind == "read":
+                # Same shape as top_pending_reports
+                list(Report.objects.filter(status="pending").annotate(vote_count=Count("votes"))
+                     .order_by("-vote_count")[:20])
+            elif kind == "report":
+                with transaction.atomic():
+                    Report.objects.create(user_id=user_id, title="Load test", description="Synthetic report",
+                                          latitude=48.853, longitude=2.349)
+            elif kind == "vote":
+                vote, created = Vote.objects.get_or_create(user_id=user_id, report_id=report_id)
+                if not created:
+                    vote.delete()  # Toggle to keep the write pressure constant
+            else:
+                Comment.objects.update_or_create(user_id=user_id, report_id=report_id,
+                                                 defaults={"content": f"Comment {rng.random()}"})
+        except OperationalError as e:
+            if "locked" not in str(e):
+                raise
+            stats[kind]["locked"] += 1
+            continue
+        stats[kind]["ok"] += 1
+        stats[kind]["latencies"].append(time.perf_counter() - start)
+
+    results.put(stats)
+
+
+class Command(BaseCommand):
+    help = "Multi-process SQLite write/read load test comparing the default and production connection profiles"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=8)
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds per profile")
+        parser.add_argument("--read-ratio", type=float, default=0.5, help="Share of read operations")
+        parser.add_argument("--profile", choices=["default", "production", "both"], default="both")
+
+    def handle(self, *args, **options):
+        profiles = ["default", "production"] if options["profile"] == "both" else [options["profile"]]
+        ctx = multiprocessing.get_context("spawn")
+
+        for profile in profiles:
+            with tempfile.TemporaryDirectory() as tmp:
+                env = {
+                    "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "VdV.settings"),
+                    "VDV_DB_NAME": str(Path(tmp) / "load.sqlite3"),
+                    "VDV_SQLITE_PROFILE": profile,
+                }
+                setup = ctx.Process(target=_prepare_database, args=(env,))
+                setup.start()
+                setup.join()
+
+                results = ctx.Queue()
+                workers = [
+                    ctx.Process(target=_worker, args=(env, seed, options["duration"], options["read_ratio"], results))
+                    for seed in range(options["processes"])
+                ]
+                for w in workers:
+                    w.start()
+                collected = [results.get() for _ in workers]
+                for w in workers:
+                    w.join()
+
+            self._report(profile, collected, options["duration"])
+
+    def _report(self, profile, collected, duration):
+        self.stdout.write(f"\n📊 Profile: {profile}")
+        self.stdout.write(f"{'operation':<10}{'ops/s':>10}{'locked':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        total_ok = total_locked = 0
+        for kind in ("read", "report", "vote", "comment"):
+            ok = sum(s[kind]["ok"] for s in collected)
+            locked = sum(s[kind]["locked"] for s in collected)
+            latencies = sorted(lat for s in collected for lat in s[kind]["latencies"])
+            p50 = latencies[len(latencies) // 2] * 1000 if latencies else 0.0
+            p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0
+            self.stdout.write(f"{kind:<10}{ok / duration:>10.0f}{locked:>10}{p50:>10.1f}{p99:>10.1f}")
+            total_ok += ok
+            total_locked += locked
+        self.stdout.write(f"{'total':<10}{total_ok / duration:>10.0f}{total_locked:>10}")
@@ -0,0 +1,161 @@
+# core.metrics
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Dict, Optional, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    """
+    Prometheus-style histogram: per label set, a count per bucket plus a running sum and count.
+    """
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets: Tuple[float, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # [bucket counts..., +Inf count, sum]
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        for labels, values in sorted(series.items()):
+            base = [f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels)]
+            cumulative = 0
+            for bound, count in zip((*map(repr, self.buckets), "+Inf"), values[:-1]):
+                cumulative += count
+                bucket_labels = ",".join(base + ['le="%s"' % bound])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            label_text = "{%s}" % ",".join(base) if base else ""
+            lines.append(f"{self.name}_sum{label_text} {values[-1]}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return "\n".join(lines)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Registry:
+    def __init__(self):
+        self.histograms: Dict[str, Histogram] = {}
+
+    def histogram(self, name: str, help_text: str, label_names: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        if name not in self.histograms:
+            self.histograms[name] = Histogram(name, help_text, label_names, buckets)
+        return self.histograms[name]
+
+    def render(self) -> str:
+        return "\n".join(h.render() for h in self.histograms.values()) + "\n"
+
+
+registry = Registry()
+
+REQUEST_SECONDS = registry.histogram(
+    "vdv_request_duration_seconds", "Time to produce a response.", ("view", "method", "status"))
+REQUEST_DB_QUERIES = registry.histogram(
+    "vdv_request_db_queries", "Database queries per request.", ("view",), COUNT_BUCKETS)
+REQUEST_DB_SECONDS = registry.histogram(
+    "vdv_request_db_seconds", "Time spent in database queries per request.", ("view",))
+STAGE_SECONDS = registry.histogram(
+    "vdv_stage_duration_seconds", "Time spent in an instrumented stage (NLP, geocoding, ...).", ("stage",))
+
+
+class RequestTimings:
+    """
+    Durations collected while one request is handled, emitted as its Server-Timing header.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float):
+        with self._lock:
+            total = self.stages.setdefault(stage, [0.0, 0])
+            total[0] += seconds
+            total[1] += 1
+
+    def get(self, stage: str) -> Tuple[float, int]:
+        seconds, count = self.stages.get(stage, (0.0, 0))
+        return seconds, count
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        entries = [
+            f'{stage};dur={seconds * 1000:.1f};desc="{count}x"'
+            for stage, (seconds, count) in self.stages.items()
+        ]
+        entries.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(entries)
+
+
+# Follows the request into sync_to_async threads and run_nlp() calls
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("vdv_request_timings", default=None)
+
+
+@contextmanager
+def timed(stage: str):
+    """
+    Time a block as `stage`, in the stage histogram and the current request's Server-Timing.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage)
+        timings = current_timings.get()
+        if timings is not None:
+            timings.add(stage, elapsed)
+
+
+def timed_stage(stage: str):
+    """
+    Decorator form of timed().
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def instrument_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper adding each query's time to the current request's "db" stage.
+    """
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings = current_timings.get()
+        if timings is not None:
+            timings.add("db", time.perf_counter() - started)
@@ -0,0 +1,111 @@
+# core.middleware
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.http import HttpResponse
+from django.urls import reverse
+
+from .metrics import REQUEST_DB_QUERIES, REQUEST_DB_SECONDS, REQUEST_SECONDS, RequestTimings, current_timings
+from .profiling import begin_profile, collapsed, end_profile, save_profile
+
+
+class ServerTimingMiddleware:
+    """
+    Collects stage and database timings for every request, returns them in a Server-Timing
+    header and records the per-view histograms served at /metrics.
+
+    Supports both sync and async stacks, so it does not force async views onto a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self._finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self._finish(request, response, timings)
+
+    @staticmethod
+    def _finish(request, response, timings: RequestTimings):
+        response["Server-Timing"] = timings.server_timing()
+
+        # Route names, not raw paths, keep the label set small
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else "unmatched"
+        db_seconds, db_queries = timings.get("db")
+        REQUEST_SECONDS.observe(timings.elapsed(), view, request.method, str(response.status_code))
+        REQUEST_DB_QUERIES.observe(db_queries, view)
+        REQUEST_DB_SECONDS.observe(db_seconds, view)
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Runs a request under the sampling profiler when a staff user asks for it, with
+    `?_profile=1` or an `X-Profile: 1` header. The collapsed stacks are stored in PROFILE_DIR
+    and linked in the X-Profile response header; `?_profile=inline` returns them as the body.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def _requested(request) -> bool:
+        return request.GET.get("_profile") in ("1", "inline") or request.headers.get("X-Profile") == "1"
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not (self._requested(request) and request.user.is_staff):
+            return self.get_response(request)
+        profiler = begin_profile()
+        try:
+            response = self.get_response(request)
+        finally:
+            stacks = end_profile(profiler) if profiler else None
+        return self._finish(request, response, stacks)
+
+    async def __acall__(self, request):
+        if not (self._requested(request) and (await request.auser()).is_staff):
+            return await self.get_response(request)
+        profiler = begin_profile()
+        try:
+            response = await self.get_response(request)
+        finally:
+            stacks = end_profile(profiler) if profiler else None
+        return self._finish(request, response, stacks)
+
+    @staticmethod
+    def _finish(request, response, stacks):
+        if stacks is None:
+            # Another request is being profiled
+            response["X-Profile"] = "busy"
+            return response
+        name = save_profile(stacks, f"{request.method}-{request.path}")
+        if request.GET.get("_profile") == "inline":
+            return HttpResponse(collapsed(stacks), content_type="text/plain; charset=utf-8")
+        response["X-Profile"] = reverse("profile_download", args=[name])
+        return response
@@ -1,7 +1,10 @@
 # core.models
 
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+from django.utils.timezone import localdate, now
 from django.utils.translation import gettext_lazy as _
 
 from core.managers import CustomUserManager
@@ -55,7 +58,29 @@ class ReportCategory(models.Model):
         verbose_name_plural = _("Report Categories")
 
 
-class Report(models.Model):
+class ChangeTracked(models.Model):
+    """
+    Stamps every save with the next value of the global "changes" sequence.
+
+    The value is allocated inside the same transaction as the write. Writers are serialized
+    on SQLite, so sequence order matches commit order and /api/changes/ can page by it
+    without missing rows.
+    """
+    change_seq = models.PositiveBigIntegerField(default=0, db_index=True, verbose_name=_("Change Sequence"))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Updated At"))
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get("using")):
+            self.change_seq = ResourceVersion.allocate(CHANGES_KEY)
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "change_seq", "updated_at"}
+            super().save(*args, **kwargs)
+
+    class Meta:
+        abstract = True
+
+
+class Report(ChangeTracked):
     STATUS_CHOICES = [
         ('pending', _("Pending")),
         ('in_progress', _("In Progress")),
@@ -82,18 +107,52 @@ class Report(models.Model):
     description = models.TextField(
         verbose_name=_("Description")
     )
+    description_en = models.TextField(
+        blank=True,
+        default="",
+        verbose_name=_("English Description")
+    )
     image = models.ImageField(
         upload_to='report_images/',
         blank=True,
         null=True,
         verbose_name=_("Image")
     )
+    thumbnail = models.ImageField(
+        upload_to='report_thumbnails/',
+        blank=True,
+        null=True,
+        verbose_name=_("Thumbnail")
+    )
+    stored_image = models.ForeignKey(
+        'StoredImage',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='reports',
+        verbose_name=_("Stored Image")
+    )
     zipcode = models.IntegerField(
         null=True,
         blank=True,
         default=None,
         verbose_name=_("Zip Code")
     )
+    # Denormalized from core/cities at creation time, so province filters are plain indexed SQL
+    place = models.CharField(
+        max_length=100,
+        blank=True,
+        default="",
+        db_index=True,
+        verbose_name=_("Place")
+    )
+    province = models.CharField(
+        max_length=100,
+        blank=True,
+        default="",
+        db_index=True,
+        verbose_name=_("Province")
+    )
     latitude = models.FloatField(verbose_name=_("Latitude"))
     longitude = models.FloatField(verbose_name=_("Longitude"))
     status = models.CharField(
@@ -110,9 +169,32 @@ class Report(models.Model):
     def __str__(self):
         return self.title
 
+    STAT_FIELDS = ("created_at", "category_id", "status", "zipcode")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the rollup key as loaded, so status/category changes can move the count
+        if all(f in field_names for f in cls.STAT_FIELDS):
+            instance._loaded_stat_key = instance.stat_key()
+        return instance
+
+    def stat_key(self):
+        """
+        The (day, category_id, status, zipcode) rollup bucket this report is counted in.
+        """
+        return localdate(self.created_at), self.category_id, self.status, self.zipcode
+
     class Meta:
         verbose_name = _("Report")
         verbose_name_plural = _("Reports")
+        indexes = [
+            models.Index(fields=["created_at"]),
+            models.Index(fields=["status", "created_at"]),
+            models.Index(fields=["category", "created_at"]),
+            models.Index(fields=["latitude", "longitude"]),
+            models.Index(fields=["zipcode", "created_at"]),
+        ]
 
 
 class Vote(models.Model):
@@ -138,7 +220,7 @@ class Vote(models.Model):
         verbose_name_plural = _("Votes")
 
 
-class Comment(models.Model):
+class Comment(ChangeTracked):
     user = models.ForeignKey(
         'User',
         on_delete=models.CASCADE,
@@ -162,9 +244,10 @@ class Comment(models.Model):
     class Meta:
         verbose_name = _("Comment")
         verbose_name_plural = _("Comments")
+        indexes = [models.Index(fields=["report", "created_at"])]
 
 
-class AdminComment(models.Model):
+class AdminComment(ChangeTracked):
     admin = models.ForeignKey(
         'Admin',
         on_delete=models.CASCADE,
@@ -188,6 +271,34 @@ class AdminComment(models.Model):
     class Meta:
         verbose_name = _("Admin Comment")
         verbose_name_plural = _("Admin Comments")
+        indexes = [models.Index(fields=["report", "created_at"])]
+
+
+class StoredImage(models.Model):
+    """
+    One normalized report image, stored once under its SHA-256 and shared by every
+    report that uploaded the same picture. Files are removed when ref_count drops to 0.
+
+    dhash is a 64-bit difference hash; its four 16-bit bands are indexed so near-identical
+    photos (Hamming distance <= 3) always share at least one band with each other.
+    """
+    sha256 = models.CharField(max_length=64, unique=True, verbose_name=_("SHA-256"))
+    image = models.ImageField(upload_to='report_images/', verbose_name=_("Image"))
+    thumbnail = models.ImageField(upload_to='report_thumbnails/', verbose_name=_("Thumbnail"))
+    ref_count = models.PositiveIntegerField(default=0, verbose_name=_("Reference Count"))
+    dhash = models.CharField(max_length=16, verbose_name=_("Perceptual Hash"))
+    dhash_band0 = models.IntegerField(db_index=True)
+    dhash_band1 = models.IntegerField(db_index=True)
+    dhash_band2 = models.IntegerField(db_index=True)
+    dhash_band3 = models.IntegerField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Created At"))
+
+    def __str__(self):
+        return self.sha256[:12]
+
+    class Meta:
+        verbose_name = _("Stored Image")
+        verbose_name_plural = _("Stored Images")
 
 
 class ReportTools(models.Model):
@@ -195,3 +306,136 @@ class ReportTools(models.Model):
         managed = False
         verbose_name = _("Report Search")
         verbose_name_plural = _("Report Search")
+
+
+class QueryStats(models.Model):
+    """
+    Admin entry for the in-memory SQL fingerprint aggregates (core.querylog); no table.
+    """
+    class Meta:
+        managed = False
+        verbose_name = _("Query Statistics")
+        verbose_name_plural = _("Query Statistics")
+
+
+CHANGES_KEY = "changes"
+
+
+class ResourceVersion(models.Model):
+    """
+    Cheap monotonic version counter for a cacheable API resource.
+
+    Keys are either collection-wide ("reports", "votes", "comments", "categories")
+    or scoped to one report ("votes:42", "comments:42"). Every write bumps the
+    relevant keys, so read endpoints can build ETag/Last-Modified validators
+    from a single indexed lookup instead of rebuilding the response.
+    """
+    key = models.CharField(max_length=64, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=now)
+
+    @classmethod
+    def bump(cls, *keys):
+        """
+        Increment the version of every given key, creating missing keys.
+        """
+        keys = set(keys)
+        timestamp = now()
+        updated = cls.objects.filter(key__in=keys).update(version=F("version") + 1, updated_at=timestamp)
+        if updated < len(keys):
+            existing = set(cls.objects.filter(key__in=keys).values_list("key", flat=True))
+            cls.objects.bulk_create(
+                [cls(key=k, version=1, updated_at=timestamp) for k in keys if k not in existing],
+                ignore_conflicts=True,
+            )
+
+    @classmethod
+    def allocate(cls, key, *also_bump) -> int:
+        """
+        Increment a key and return its new version; call inside the transaction that uses it.
+        Keys in `also_bump` are incremented by the same UPDATE.
+        """
+        cls.bump(key, *also_bump)
+        return cls.objects.filter(key=key).values_list("version", flat=True).get()
+
+    @classmethod
+    def snapshot(cls, keys):
+        """
+        Return a {key: (version, updated_at)} mapping; unknown keys map to (0, None).
+        """
+        found = {
+            key: (version, updated_at)
+            for key, version, updated_at in cls.objects.filter(key__in=keys).values_list(
+                "key", "version", "updated_at"
+            )
+        }
+        return {key: found.get(key, (0, None)) for key in keys}
+
+    @classmethod
+    async def asnapshot(cls, keys):
+        """
+        Async version of snapshot(), for async views.
+        """
+        found = {
+            key: (version, updated_at)
+            async for key, version, updated_at in cls.objects.filter(key__in=keys).values_list(
+                "key", "version", "updated_at"
+            )
+        }
+        return {key: found.get(key, (0, None)) for key in keys}
+
+    def __str__(self):
+        return f"{self.key}@{self.version}"
+
+    class Meta:
+        verbose_name = _("Resource Version")
+        verbose_name_plural = _("Resource Versions")
+
+
+class ChangeTombstone(models.Model):
+    """
+    Marks a deleted report or comment, so /api/changes/ can tell clients to drop it.
+    """
+    KIND_CHOICES = [
+        ('report', _("Report")),
+        ('comment', _("Comment")),
+        ('admin_comment', _("Admin Comment")),
+    ]
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, verbose_name=_("Kind"))
+    object_id = models.PositiveBigIntegerField(verbose_name=_("Object ID"))
+    report_id = models.PositiveBigIntegerField(verbose_name=_("Report ID"))
+    change_seq = models.PositiveBigIntegerField(db_index=True, verbose_name=_("Change Sequence"))
+
+    class Meta:
+        verbose_name = _("Change Tombstone")
+        verbose_name_plural = _("Change Tombstones")
+
+
+class ReportStat(models.Model):
+    """
+    Incrementally maintained count of reports per (day, category, status, zipcode).
+    Dashboards and /api/stats/ read only from this table, never from Report.
+    """
+    day = models.DateField(verbose_name=_("Day"))
+    category = models.ForeignKey(
+        'ReportCategory',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name=_("Category")
+    )
+    status = models.CharField(max_length=20, verbose_name=_("Status"))
+    zipcode = models.IntegerField(null=True, blank=True, verbose_name=_("Zip Code"))
+    count = models.IntegerField(default=0, verbose_name=_("Count"))
+
+    class Meta:
+        constraints = [
+            # NULL category and zipcode are buckets of their own and must stay unique too. SQLite
+            # ignores nulls_distinct=False, so the index is on the values with NULL mapped to 0.
+            models.UniqueConstraint(
+                F("day"), Coalesce("category", Value(0)), F("status"), Coalesce("zipcode", Value(0)),
+                name="reportstat_unique_bucket",
+            ),
+        ]
+        verbose_name = _("Report Statistics")
+        verbose_name_plural = _("Report Statistics")
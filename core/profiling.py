@@ -0,0 +1,130 @@
+# core.profiling
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+from django.conf import settings
+
+PROFILE_NAME = re.compile(r"^[\w.-]+\.collapsed$")
+_UNSAFE = re.compile(r"[^\w.-]+")
+
+_PROJECT_ROOT = str(settings.BASE_DIR)
+_THIS_FILE = os.path.abspath(__file__)
+
+# One profile at a time: the sampler sees every thread of the process
+_profile_lock = threading.Lock()
+
+
+def _is_project_frame(filename: str) -> bool:
+    return filename.startswith(_PROJECT_ROOT) and "site-packages" not in filename and filename != _THIS_FILE
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(_PROJECT_ROOT):
+        filename = os.path.relpath(filename, _PROJECT_ROOT)
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename})"
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of all threads every `interval` seconds from a background thread.
+
+    Requests hop between the event loop, sync_to_async threads and the NLP pool, so every
+    thread is sampled and only stacks running project code are kept. Idle threads are left out.
+    Concurrent requests in the same process show up too.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="vdv-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                in_project = False
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    in_project = in_project or _is_project_frame(frame.f_code.co_filename)
+                    frame = frame.f_back
+                if not in_project:
+                    continue
+                if ident not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack.append(names.get(ident, "thread"))
+                self.stacks[";".join(reversed(stack))] += 1
+
+
+def collapsed(stacks: Counter) -> str:
+    """
+    Render stacks in the collapsed format read by flamegraph.pl and speedscope.
+    """
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def prune_profiles(directory: Path):
+    """
+    Keep at most PROFILE_MAX_FILES profiles, none older than PROFILE_MAX_AGE_DAYS.
+    """
+    files = sorted(directory.glob("*.collapsed"), key=lambda p: p.stat().st_mtime, reverse=True)
+    cutoff = time.time() - settings.PROFILE_MAX_AGE_DAYS * 86400
+    for index, path in enumerate(files):
+        if index >= settings.PROFILE_MAX_FILES or path.stat().st_mtime < cutoff:
+            path.unlink(missing_ok=True)
+
+
+def save_profile(stacks: Counter, label: str) -> str:
+    """
+    Store a profile in PROFILE_DIR and return its file name.
+    """
+    directory = Path(settings.PROFILE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    label = _UNSAFE.sub("_", label).strip("_")[:60]
+    now = time.time()
+    name = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}{int(now % 1 * 1000):03d}-{label}.collapsed"
+    (directory / name).write_text(collapsed(stacks))
+    prune_profiles(directory)
+    return name
+
+
+def begin_profile() -> Optional[SamplingProfiler]:
+    """
+    Start a profiler, or return None if another request is already being profiled.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        return None
+    profiler = SamplingProfiler(settings.PROFILE_INTERVAL)
+    profiler.start()
+    return profiler
+
+
+def end_profile(profiler: SamplingProfiler) -> Counter:
+    try:
+        return profiler.stop()
+    finally:
+        _profile_lock.release()
@@ -0,0 +1,137 @@
+# core.querylog
+import logging
+import random
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, List
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.\"])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|\?")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(sql: str) -> str:
+    """
+    Normalize SQL so queries differing only in literals share one shape:
+    literals and placeholders become ?, IN lists of any length become (...).
+    Cached: the ORM sends parameters apart, so the same statements come back on every request.
+    """
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _VALUE_LIST.sub("(...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+class FingerprintStats:
+    """
+    Aggregates of one query shape; durations are kept as a bounded reservoir sample for percentiles.
+    """
+
+    def __init__(self, sql: str, sample_size: int):
+        self.sql = sql
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        # Rows affected by writes; SELECTs add nothing, as SQLite reports -1 for them
+        self.rows = 0
+        self.sample: List[float] = []
+        self.sample_size = sample_size
+
+    def add(self, seconds: float, rows: int):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if rows > 0:
+            self.rows += rows
+        if len(self.sample) < self.sample_size:
+            self.sample.append(seconds)
+        else:
+            index = random.randrange(self.count)
+            if index < self.sample_size:
+                self.sample[index] = seconds
+
+    def percentile(self, q: float) -> float:
+        if not self.sample:
+            return 0.0
+        ordered = sorted(self.sample)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def as_dict(self) -> dict:
+        return {
+            "sql": self.sql,
+            "count": self.count,
+            "total_ms": self.total * 1000,
+            "mean_ms": self.total / self.count * 1000,
+            "p50_ms": self.percentile(0.50) * 1000,
+            "p99_ms": self.percentile(0.99) * 1000,
+            "max_ms": self.max * 1000,
+            "rows": self.rows,
+        }
+
+
+class QueryLog:
+    """
+    Per-process aggregates of every database query, keyed by SQL fingerprint.
+
+    Only the `max_fingerprints` shapes with the most total time are kept; queries slower
+    than `slow_ms` are also written to the "core.querylog" logger.
+    """
+
+    def __init__(self, max_fingerprints: int, sample_size: int, slow_ms: float):
+        self.max_fingerprints = max_fingerprints
+        self.sample_size = sample_size
+        self.slow_ms = slow_ms
+        self._stats: Dict[str, FingerprintStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, sql: str, seconds: float, rows: int):
+        shape = fingerprint(sql)
+        with self._lock:
+            stats = self._stats.get(shape)
+            if stats is None:
+                if len(self._stats) >= self.max_fingerprints:
+                    # Drop the shape that cost the least so far
+                    del self._stats[min(self._stats, key=lambda key: self._stats[key].total)]
+                stats = self._stats[shape] = FingerprintStats(shape, self.sample_size)
+            stats.add(seconds, rows)
+
+        if seconds * 1000 >= self.slow_ms:
+            logger.warning("Slow query (%.1f ms): %s", seconds * 1000, shape)
+
+    def top(self, order_by: str = "total_ms", limit: int = 50) -> List[dict]:
+        with self._lock:
+            rows = [stats.as_dict() for stats in self._stats.values()]
+        return sorted(rows, key=lambda row: row[order_by], reverse=True)[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+query_log = QueryLog(
+    max_fingerprints=settings.QUERY_LOG_MAX_FINGERPRINTS,
+    sample_size=settings.QUERY_LOG_SAMPLE_SIZE,
+    slow_ms=settings.SLOW_QUERY_MS,
+)
+
+
+def log_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper feeding query_log with each query's duration and affected rows.
+    """
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        # SQLite reports -1 rows for SELECT statements
+        query_log.record(sql, time.perf_counter() - started, getattr(context["cursor"], "rowcount", -1))
@@ -0,0 +1,132 @@
+# core.search
+import math
+import re
+from typing import List, Tuple
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+FTS_TABLE = "core_report_fts"
+
+# Column weights for bm25(): a hit in the title counts more than one in the body
+BM25_WEIGHTS = (10.0, 1.0, 1.0)  # title, description, description_en
+
+# How much a report's popularity lifts its text relevance
+VOTE_WEIGHT = 0.5
+
+_CREATE_TABLE = f"""
+CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+    title, description, description_en,
+    content='core_report', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+)
+"""
+
+_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON core_report BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description, description_en)
+        VALUES (new.id, new.title, new.description, new.description_en);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON core_report BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, description_en)
+        VALUES ('delete', old.id, old.title, old.description, old.description_en);
+    END
+    """,
+    # Only text columns: status changes and votes never touch the index
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, description, description_en ON core_report
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, description_en)
+        VALUES ('delete', old.id, old.title, old.description, old.description_en);
+        INSERT INTO {FTS_TABLE}(rowid, title, description, description_en)
+        VALUES (new.id, new.title, new.description, new.description_en);
+    END
+    """,
+]
+
+
+def install_search_index(using: str = DEFAULT_DB_ALIAS) -> bool:
+    """
+    Create the FTS5 index over reports and the triggers that keep it current.
+    A newly created index is filled from the existing reports.
+
+    :param using: The database alias.
+    :return: True if the index was created, False if it already existed (or the backend is not SQLite).
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+        created = cursor.fetchone() is None
+        if created:
+            cursor.execute(_CREATE_TABLE)
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        for trigger in _TRIGGERS:
+            cursor.execute(trigger)
+    return created
+
+
+def rebuild_search_index(using: str = DEFAULT_DB_ALIAS):
+    """
+    Re-read every report into the index (e.g. after bulk imports that bypassed SQLite).
+    """
+    install_search_index(using)
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+
+
+def build_match_query(text: str) -> str:
+    """
+    Turn free user input into a safe FTS5 MATCH expression.
+
+    Every word becomes a quoted term (so FTS5 operators in the input are inert) and the last
+    one is a prefix term, so "pot" finds "pothole" while the user is typing.
+    """
+    terms = re.findall(r"\w+", text)[:10]
+    if not terms:
+        return ""
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def search_report_ids(text: str, limit: int = 20, using: str = DEFAULT_DB_ALIAS) -> List[Tuple[int, float]]:
+    """
+    Find the best matching reports ranked by bm25 relevance combined with their vote count.
+
+    Only the top bm25 candidates are re-ranked by votes, so the cost is bounded by the index
+    lookup rather than by the number of reports.
+
+    :param text: The raw search text.
+    :param limit: The maximum number of results.
+    :param using: The database alias.
+    :return: A list of (report_id, score) tuples, best first.
+    """
+    match = build_match_query(text)
+    if not match:
+        return []
+
+    weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+    query = f"""
+    SELECT hits.rowid, hits.rank, (SELECT COUNT(*) FROM core_vote WHERE core_vote.report_id = hits.rowid)
+    FROM (
+        SELECT rowid, bm25({FTS_TABLE}, {weights}) AS rank
+        FROM {FTS_TABLE}
+        WHERE {FTS_TABLE} MATCH %s
+        ORDER BY rank
+        LIMIT %s
+    ) AS hits
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(query, [match, max(limit * 5, 100)])
+        rows = cursor.fetchall()
+
+    # bm25() is negative, lower is better
+    scored = [(report_id, -rank + VOTE_WEIGHT * math.log1p(votes)) for report_id, rank, votes in rows]
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return scored[:limit]
@@ -0,0 +1,144 @@
+# core.signals
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_delete
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils.timezone import now
+
+from .models import AdminComment, Comment, Report, ReportCategory, ResourceVersion, Vote
+from .changes import next_change_seq, record_tombstone, touch_reports
+from .events import event_broker, publish_on_commit, publish_vote_counts
+from .images import release_stored_image
+from .metrics import instrument_query
+from .querylog import log_query
+from .search import install_search_index
+from .stats import track_report_change, uncategorize_report_stats
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    """
+    Attribute every query's time to the current request (Server-Timing, /metrics)
+    and to its SQL fingerprint (slow-query log).
+    """
+    # The same wrapper object reconnects after every closed connection
+    for wrapper in (instrument_query, log_query):
+        if wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.append(wrapper)
+
+
+@receiver(connection_created)
+def apply_sqlite_profile(sender, connection, **kwargs):
+    """
+    Apply settings.SQLITE_PRAGMAS to every new SQLite connection.
+    """
+    if connection.vendor != "sqlite" or not settings.SQLITE_PRAGMAS:
+        return
+    with connection.cursor() as cursor:
+        for pragma, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {pragma} = {value}")
+
+
+@receiver(post_migrate)
+def create_search_index(sender, app_config=None, using="default", **kwargs):
+    """
+    The FTS5 table cannot be expressed as a model, so it is (re)installed after every migrate.
+    """
+    if app_config is not None and app_config.label == "core":
+        install_search_index(using)
+
+
+@receiver([post_save, post_delete], sender=Report)
+def bump_report_versions(sender, instance, **kwargs):
+    ResourceVersion.bump("reports")
+
+
+@receiver(post_save, sender=Report)
+def update_report_stats_on_save(sender, instance, created, **kwargs):
+    track_report_change(instance, created=created)
+
+
+@receiver(post_delete, sender=Report)
+def update_report_stats_on_delete(sender, instance, **kwargs):
+    track_report_change(instance, deleted=True)
+
+
+@receiver(post_delete, sender=Report)
+def release_report_image(sender, instance, **kwargs):
+    if instance.stored_image_id:
+        release_stored_image(instance.stored_image_id)
+
+
+@receiver([post_save, post_delete], sender=ReportCategory)
+def bump_category_versions(sender, instance, **kwargs):
+    ResourceVersion.bump("categories")
+
+
+@receiver(pre_delete, sender=ReportCategory)
+def uncategorize_reports(sender, instance, **kwargs):
+    # The SET_NULL cascade is a bulk update that skips change tracking and the rollups,
+    # so the category's reports are detached here first, inside the delete's transaction
+    uncategorize_report_stats(instance.pk)
+    report_ids = list(Report.objects.filter(category_id=instance.pk).values_list("id", flat=True))
+    if report_ids:
+        Report.objects.filter(id__in=report_ids).update(
+            category=None, change_seq=next_change_seq("reports", "categories"), updated_at=now()
+        )
+
+
+@receiver([post_save, post_delete], sender=Vote)
+def bump_vote_versions(sender, instance, **kwargs):
+    # The vote count is part of the report payload returned by /api/changes/, so the report is
+    # touched in the vote's transaction, with one UPDATE for the vote keys and the "changes" sequence.
+    # VoteBuffer writes with bulk_create, which sends no signal, and touches its reports itself.
+    touch_reports([instance.report_id], "votes", f"votes:{instance.report_id}")
+
+
+@receiver([post_save, post_delete], sender=Comment)
+@receiver([post_save, post_delete], sender=AdminComment)
+def bump_comment_versions(sender, instance, **kwargs):
+    ResourceVersion.bump("comments", f"comments:{instance.report_id}")
+
+
+@receiver(post_save, sender=Report)
+def publish_report_saved(sender, instance, created, **kwargs):
+    publish_on_commit("report", {
+        "id": instance.id,
+        "action": "created" if created else "updated",
+        "status": instance.status,
+    })
+
+
+@receiver(post_delete, sender=Report)
+def publish_report_deleted(sender, instance, **kwargs):
+    publish_on_commit("report", {"id": instance.id, "action": "deleted"})
+
+
+@receiver([post_save, post_delete], sender=Vote)
+def publish_vote_count(sender, instance, **kwargs):
+    if event_broker.subscriber_count == 0:
+        return
+    report_id = instance.report_id
+    transaction.on_commit(lambda: publish_vote_counts([report_id]))
+
+
+@receiver([post_save, post_delete], sender=Comment)
+@receiver([post_save, post_delete], sender=AdminComment)
+def publish_comment(sender, instance, **kwargs):
+    publish_on_commit("comment", {"report_id": instance.report_id})
+
+
+@receiver(post_delete, sender=Report)
+def record_report_tombstone(sender, instance, **kwargs):
+    record_tombstone("report", instance.id, instance.id)
+
+
+@receiver(post_delete, sender=Comment)
+def record_comment_tombstone(sender, instance, **kwargs):
+    record_tombstone("comment", instance.id, instance.report_id)
+
+
+@receiver(post_delete, sender=AdminComment)
+def record_admin_comment_tombstone(sender, instance, **kwargs):
+    record_tombstone("admin_comment", instance.id, instance.report_id)
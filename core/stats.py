@@ -0,0 +1,162 @@
+# core.stats
+from collections import Counter, defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+
+from .cities.helper import get_city_info_by_zipcodes
+from .models import Report, ReportStat
+
+StatKey = Tuple[date, Optional[int], str, Optional[int]]
+
+# Dimensions accepted by query_report_stats, mapped to rollup columns
+STAT_DIMENSIONS = {
+    "day": "day",
+    "category": "category__name",
+    "status": "status",
+    "zipcode": "zipcode",
+    "province": "zipcode",  # folded into provinces after the query
+}
+
+
+def apply_report_stat_deltas(deltas: Dict[StatKey, int]):
+    """
+    Add signed deltas to the rollup buckets, creating missing buckets.
+    Callers changing many reports at once should merge their deltas into one call.
+
+    :param deltas: Mapping of (day, category_id, status, zipcode) to the count change.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    with transaction.atomic():
+        # One read, one UPDATE and one INSERT per batch, however many buckets change
+        candidates = ReportStat.objects.filter(
+            day__in={key[0] for key in deltas}, status__in={key[2] for key in deltas}
+        )
+        existing = {}
+        for stat in candidates:
+            key = (stat.day, stat.category_id, stat.status, stat.zipcode)
+            if key in deltas:
+                stat.count = F("count") + deltas[key]
+                existing[key] = stat
+        ReportStat.objects.bulk_update(existing.values(), ["count"], batch_size=500)
+        ReportStat.objects.bulk_create(
+            [
+                ReportStat(day=day, category_id=category_id, status=status, zipcode=zipcode, count=delta)
+                for (day, category_id, status, zipcode), delta in deltas.items()
+                if (day, category_id, status, zipcode) not in existing
+            ],
+            batch_size=500,
+        )
+
+
+def uncategorize_report_stats(category_id: int):
+    """
+    Move the rollup counts of a category about to be deleted into the uncategorized buckets,
+    as its reports lose their category (Report.category is SET_NULL).
+    """
+    with transaction.atomic():
+        buckets = ReportStat.objects.filter(category_id=category_id)
+        deltas = Counter()
+        for day, status, zipcode, count in buckets.values_list("day", "status", "zipcode", "count"):
+            deltas[(day, None, status, zipcode)] += count
+        # Deleted first: SET_NULL on them would collide with the existing uncategorized buckets
+        buckets.delete()
+        apply_report_stat_deltas(deltas)
+
+
+def track_report_change(report: Report, created: bool = False, deleted: bool = False):
+    """
+    Move a report's contribution between rollup buckets after it was saved or deleted.
+    """
+    deltas = Counter()
+    old_key = getattr(report, "_loaded_stat_key", None)
+    new_key = report.stat_key()
+
+    if deleted:
+        deltas[old_key or new_key] -= 1
+    elif created:
+        deltas[new_key] += 1
+    elif old_key is not None and old_key != new_key:
+        deltas[old_key] -= 1
+        deltas[new_key] += 1
+
+    if deltas:
+        apply_report_stat_deltas(deltas)
+    report._loaded_stat_key = None if deleted else new_key
+
+
+def rebuild_report_stats() -> int:
+    """
+    Recompute every rollup bucket from the Report table.
+
+    :return: The number of buckets written.
+    """
+    rows = (
+        Report.objects.annotate(day=TruncDate("created_at"))
+        .values("day", "category_id", "status", "zipcode")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+    with transaction.atomic():
+        ReportStat.objects.all().delete()
+        stats = ReportStat.objects.bulk_create(
+            [
+                ReportStat(day=row["day"], category_id=row["category_id"], status=row["status"],
+                           zipcode=row["zipcode"], count=row["n"])
+                for row in rows.iterator(chunk_size=2000)
+            ],
+            batch_size=2000,
+        )
+    return len(stats)
+
+
+def query_report_stats(dimensions: Iterable[str], start: Optional[date] = None, end: Optional[date] = None,
+                       categories: Optional[List[str]] = None, statuses: Optional[List[str]] = None) -> List[dict]:
+    """
+    Aggregate the rollups along the given dimensions.
+
+    :param dimensions: Names from STAT_DIMENSIONS, e.g. ["day", "category"].
+    :param start: First day included.
+    :param end: Last day included.
+    :param categories: Only count these category names.
+    :param statuses: Only count these statuses.
+    :return: A list of {<dimension>: value, ..., "count": n} dictionaries.
+    """
+    dimensions = list(dimensions)
+    columns = list(dict.fromkeys(STAT_DIMENSIONS[d] for d in dimensions))
+
+    stats = ReportStat.objects.all()
+    if start:
+        stats = stats.filter(day__gte=start)
+    if end:
+        stats = stats.filter(day__lte=end)
+    if categories:
+        stats = stats.filter(category__name__in=categories)
+    if statuses:
+        stats = stats.filter(status__in=statuses)
+    rows = stats.values(*columns).annotate(n=Sum("count")).filter(n__gt=0).order_by(*columns)
+
+    provinces = {}
+    if "province" in dimensions:
+        zipcodes = list({row["zipcode"] for row in rows if row["zipcode"] is not None})
+        provinces = {int(c["zipcode"]): c["province"] for c in get_city_info_by_zipcodes(zipcodes)}
+
+    totals = defaultdict(int)
+    for row in rows:
+        key = []
+        for d in dimensions:
+            value = row[STAT_DIMENSIONS[d]]
+            if d == "province":
+                value = provinces.get(value, "Out seas")
+            elif d == "day":
+                value = value.isoformat()
+            key.append(value)
+        totals[tuple(key)] += row["n"]
+
+    return [{**dict(zip(dimensions, key)), "count": n} for key, n in totals.items()]
@@ -0,0 +1,139 @@
+# core.synthetic
+import random
+from datetime import timedelta
+from typing import Dict, List
+
+from django.db import transaction
+from django.utils.timezone import now
+
+from .changes import allocate_change_seqs
+from .models import Comment, Report, ReportCategory, ResourceVersion, User, Vote
+from .stats import rebuild_report_stats
+from .utils import categories
+
+# "testuser" prefix so clear_dev_data also removes synthetic users and everything they own
+USER_PREFIX = "testuser_synth"
+
+# A sample of the cities database: (zipcode, place, province, latitude, longitude)
+PLACES = [
+    (75001, "Paris 01", "Paris", 48.8592, 2.3417),
+    (75005, "Paris 05", "Paris", 48.8448, 2.3471),
+    (75008, "Paris 08", "Paris", 48.8763, 2.3182),
+    (75011, "Paris 11", "Paris", 48.8574, 2.3795),
+    (75015, "Paris 15", "Paris", 48.8412, 2.3003),
+    (75018, "Paris 18", "Paris", 48.8925, 2.3484),
+    (92100, "Boulogne-Billancourt", "Hauts-de-Seine", 48.8356, 2.2410),
+    (93200, "Saint-Denis", "Seine-Saint-Denis", 48.9356, 2.3539),
+    (94300, "Vincennes", "Val-de-Marne", 48.8474, 2.4396),
+]
+
+TEMPLATES = {
+    "en": [
+        "There is a problem with the {kw} near the {place} market.",
+        "The {kw} on our street has been an issue for {days} days.",
+        "Please send someone to look at the {kw}, it keeps getting worse.",
+    ],
+    "fr": [
+        "Il y a un problème de {kw} près du marché de {place}.",
+        "Le {kw} de notre rue pose problème depuis {days} jours.",
+    ],
+}
+
+
+def synthetic_texts(n: int, seed: int = 0) -> List[str]:
+    """
+    Build `n` report descriptions mentioning category keywords, about one in three in French.
+
+    :param n: Number of texts.
+    :param seed: Seed of the generator; the same seed always yields the same texts.
+    :return: A list of descriptions.
+    """
+    rng = random.Random(seed)
+    keywords = [kw for info in categories.values() for kw in info["keywords"]]
+    texts = []
+    for _ in range(n):
+        lang = "fr" if rng.random() < 1 / 3 else "en"
+        template = rng.choice(TEMPLATES[lang])
+        texts.append(template.format(kw=rng.choice(keywords), place=rng.choice(PLACES)[1], days=rng.randint(2, 30)))
+    return texts
+
+
+@transaction.atomic
+def generate_dataset(reports: int, seed: int = 0, users: int = 20, votes_per_report: int = 3,
+                     comments_per_report: int = 2, legacy_ratio: float = 0.2) -> Dict[str, List[int]]:
+    """
+    Create a reproducible dataset of users, reports, votes and comments with bulk inserts.
+
+    Rows are created without running the NLP pipeline; categories are drawn at random. Signals
+    are not sent, so the statistics rollups are rebuilt and the cache versions bumped afterwards.
+
+    :param reports: Number of reports to create.
+    :param seed: Seed of the generator; the same seed always yields the same content.
+    :param users: Number of synthetic users owning, voting on and commenting the reports.
+    :param votes_per_report: Average number of votes per report.
+    :param comments_per_report: Average number of comments per report.
+    :param legacy_ratio: Share of reports without a stored place and province, which
+                         build_report_data() must look up in the cities database.
+    :return: The ids of the created (or reused) users and of the created reports.
+    """
+    rng = random.Random(seed)
+    created_at = now()
+
+    User.objects.bulk_create(
+        [User(username=f"{USER_PREFIX}_{seed}_{i}", email=f"{USER_PREFIX}_{seed}_{i}@example.com")
+         for i in range(users)],
+        ignore_conflicts=True,
+    )
+    user_ids = list(
+        User.objects.filter(username__startswith=f"{USER_PREFIX}_{seed}_").order_by("id").values_list("id", flat=True)
+    )
+
+    category_ids = [
+        ReportCategory.objects.get_or_create(name=info["name"], defaults={"description": info["description"]})[0].id
+        for info in categories.values()
+    ]
+
+    statuses = [status for status, _ in Report.STATUS_CHOICES]
+    texts = synthetic_texts(reports, seed)
+    rows = []
+    for text in texts:
+        zipcode, place, province, lat, lon = rng.choice(PLACES)
+        legacy = rng.random() < legacy_ratio
+        rows.append(Report(
+            user_id=rng.choice(user_ids),
+            title=text[:60],
+            description=text,
+            category_id=rng.choice(category_ids),
+            status=rng.choice(statuses),
+            latitude=lat + rng.uniform(-0.01, 0.01),
+            longitude=lon + rng.uniform(-0.01, 0.01),
+            zipcode=zipcode,
+            place="" if legacy else place,
+            province="" if legacy else province,
+        ))
+    dates = [created_at - timedelta(days=rng.randint(0, 90), minutes=rng.randint(0, 1439)) for _ in rows]
+    Report.objects.bulk_create(rows, batch_size=500)
+    report_ids = [r.id for r in rows]
+
+    votes = []
+    comments = []
+    for report_id in report_ids:
+        for user_id in rng.sample(user_ids, min(len(user_ids), rng.randint(0, 2 * votes_per_report))):
+            votes.append(Vote(user_id=user_id, report_id=report_id))
+        for _ in range(rng.randint(0, 2 * comments_per_report)):
+            comments.append(Comment(user_id=rng.choice(user_ids), report_id=report_id,
+                                    content=rng.choice(texts)))
+    # One sequence value per row, in insertion order, as if they had been written one by one
+    first_seq = allocate_change_seqs(len(rows) + len(comments))
+    for offset, row in enumerate(rows + comments):
+        row.change_seq = first_seq + offset
+    # auto_now_add overrides created_at on insert
+    for report, date in zip(rows, dates):
+        report.created_at = date
+    Report.objects.bulk_update(rows, ["created_at", "change_seq"], batch_size=500)
+    Vote.objects.bulk_create(votes, batch_size=1000)
+    Comment.objects.bulk_create(comments, batch_size=1000)
+
+    rebuild_report_stats()
+    ResourceVersion.bump("reports", "votes", "comments", "categories")
+    return {"users": user_ids, "reports": report_ids}
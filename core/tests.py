@@ -1,3 +1,682 @@
-from django.test import TestCase
+import asyncio
+import csv
+import io
+import json
+import math
+import tempfile
+from datetime import date, datetime
+from collections import Counter
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, connection
+from django.db.models import Max
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import make_aware
+
+from core.admin import EstimatedCountPaginator
+from core.events import event_broker, publish_vote_counts
+from core.export import EXPORT_FIELDS
+from core.executors import AdmissionGate, AdmissionRejected, TokenBucket, nlp_executor
+from core.images import release_stored_image
+from core.models import (CHANGES_KEY, Admin, AdminComment, Comment, Report, ReportCategory, ReportStat,
+                         ResourceVersion, StoredImage, User, Vote)
+from core.profiling import save_profile
+from core.synthetic import generate_dataset
+from core.utils import (build_comment_thread, bulk_update_report_status, create_or_update_admin_comment,
+                        translate_category_text)
+from core.vote_buffer import VoteBuffer
+
+# Expected status and maximum number of SQL queries per request, whatever the size of the result.
+# Session and user lookups (2 queries) and the ETag version snapshot (1 query) are included.
+READ_BUDGETS = {
+    "reports_list": ("/api/reports/?n=50", 200, 4),
+    "query_reports": ("/api/reports/query/?n=50&sort=votes", 200, 4),
+    "query_reports_filtered": ("/api/reports/query/?n=50&status=pending,in_progress&province=Paris", 200, 4),
+    "search_reports": ("/api/reports/search/?q=street&n=20", 200, 5),
+    "reports_stats": ("/api/reports/stats/?ids={report_ids}", 200, 4),
+    "report_vote_count": ("/api/reports/{report_id}/votes/", 200, 5),
+    "top_pending_reports": ("/api/reports/top-pending/?n=50", 200, 4),
+    "report_comments": ("/api/reports/{report_id}/comments/", 200, 5),
+    "changes_since": ("/api/changes/?limit=500", 200, 11),
+    "report_statistics": ("/api/stats/?group_by=day,category", 200, 4),
+    "get_report_categories": ("/api/categories/", 200, 4),
+    "get_reports_by_category": ("/api/reports/by_category/?category_name=Traffic&n=50", 200, 5),
+    "user_reports_by_time": ("/api/reports/user/", 200, 4),
+    "user_voted_reports": ("/api/reports/user/voted/", 200, 5),
+    "user_commented_reports": ("/api/reports/user/commented/", 200, 5),
+    "export_reports_ndjson": ("/api/reports/export/?format=ndjson", 200, 3),
+    "export_reports_csv": ("/api/reports/export/?format=csv", 200, 3),
+    "admin_report_change": ("/admin/core/report/{report_id}/change/", 200, 6),
+    "admin_reporttools": ("/admin/core/reporttools/", 200, 3),
+    "admin_comments": ("/admin/core/comment/", 200, 5),
+    "admin_admincomments": ("/admin/core/admincomment/", 200, 5),
+    "admin_votes": ("/admin/core/vote/", 200, 5),
+}
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Every URL of core/urls.py (and the admin pages listing reports) must stay within a fixed
+    number of queries. Read endpoints are requested on a small dataset and again after it grew
+    tenfold; both runs must fit the budget and the second may not issue more queries.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        dataset = generate_dataset(5, seed=0)
+        cls.user = User.objects.get(id=dataset["users"][0])
+        cls.user.is_staff = cls.user.is_superuser = True
+        cls.user.save()
+        cls.admin = Admin.objects.create_user("testadmin_budget", "testadmin_budget@example.com", is_staff=True)
+        cls.report = Report.objects.get(id=dataset["reports"][0])
+        # So the per-user lists are never empty, which would skip their queries
+        Vote.objects.get_or_create(user=cls.user, report=cls.report)
+        Comment.objects.create(user=cls.user, report=cls.report, content="Seen it too")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def _grow(self):
+        """
+        Add reports, votes and comments, including on the report the per-report URLs read.
+        """
+        generate_dataset(50, seed=0)
+        Comment.objects.bulk_create([
+            Comment(user=self.user, report=self.report, content=f"Comment {i}") for i in range(20)
+        ])
+        AdminComment.objects.bulk_create([
+            AdminComment(admin=self.admin, report=self.report, content=f"Admin comment {i}") for i in range(10)
+        ])
+
+    def _count_queries(self, method: str, url: str, **kwargs):
+        # Count the cold case, not whatever earlier requests left in the content type cache
+        ContentType.objects.clear_cache()
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(url, **kwargs)
+            if response.streaming:
+                b"".join(response.streaming_content)
+        return response, context.captured_queries
+
+    def assertWithinBudget(self, budget: int, status: int, method: str, url: str, **kwargs) -> int:
+        response, queries = self._count_queries(method, url, **kwargs)
+        # An error page usually costs fewer queries and would pass the budget unnoticed
+        self.assertEqual(response.status_code, status, f"{method.upper()} {url}")
+        self._check_budget(budget, method, url, queries)
+        return len(queries)
+
+    def _check_budget(self, budget: int, method: str, url: str, queries):
+        if len(queries) > budget:
+            # Show the repeated statements, which are usually the N+1 culprit
+            repeated = Counter(q["sql"] for q in queries).most_common(3)
+            self.fail(f"{method.upper()} {url}: {len(queries)} queries, budget {budget}\n"
+                      + "\n".join(f"{n}x {sql}" for sql, n in repeated))
+
+    def _format(self, url: str) -> str:
+        report_ids = Report.objects.order_by("id").values_list("id", flat=True)[:50]
+        return url.format(report_id=self.report.id, report_ids=",".join(map(str, report_ids)))
+
+    def test_read_endpoints(self):
+        small = {}
+        for name, (url, status, budget) in READ_BUDGETS.items():
+            with self.subTest(name):
+                small[name] = self.assertWithinBudget(budget, status, "get", self._format(url))
+
+        self._grow()
+        for name, (url, status, budget) in READ_BUDGETS.items():
+            with self.subTest(name, dataset="grown"):
+                grown = self.assertWithinBudget(budget, status, "get", self._format(url))
+                self.assertLessEqual(grown, small.get(name, budget), f"{name}: query count grows with the result size")
+
+    def test_search_budget_covers_hits(self):
+        # Without hits the report rows are never loaded and the budget would measure less
+        url = READ_BUDGETS["search_reports"][0]
+        self.assertTrue(self.client.get(url).json()["reports"])
+        self._grow()
+        self.assertTrue(self.client.get(url).json()["reports"])
+
+    def test_events_stream(self):
+        # Only the ASGI handler streams events (the sync client gets 503), so use the async client
+        async def open_stream():
+            response = await self.async_client.get("/api/events/")
+            # The stream never ends: read its opening chunk, then hang up as a client would
+            chunk = await anext(aiter(response.streaming_content))
+            await response._iterator.aclose()
+            return response, chunk
+
+        self.async_client.force_login(self.user)
+        with CaptureQueriesContext(connection) as context:
+            response, chunk = async_to_sync(open_stream)()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(chunk.startswith(b"retry:"))
+        self.assertEqual(event_broker.subscriber_count, 0)
+        self._check_budget(2, "get", "/api/events/", context.captured_queries)
+
+    def test_profile_download(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(PROFILE_DIR=directory):
+            name = save_profile(Counter({"main;view": 1}), "budget")
+            self.assertWithinBudget(2, 200, "get", reverse("profile_download", args=[name]))
+
+    def test_metrics(self):
+        self.assertWithinBudget(2, 200, "get", "/metrics")
+
+    def test_create_report(self):
+        body = {"title": "Pothole", "description": "Large pothole on the road", "latitude": 48.853, "longitude": 2.349}
+        self.assertWithinBudget(15, 201, "post", "/api/reports/", data=json.dumps(body), content_type="application/json")
+
+    def test_create_vote(self):
+        body = json.dumps({"report_id": self.report.id})
+        self.assertWithinBudget(3, 201, "post", "/api/votes/", data=body, content_type="application/json")
+        # Voting again finds the existing vote
+        self.assertWithinBudget(3, 201, "post", "/api/votes/", data=body, content_type="application/json")
+
+    def test_create_comment(self):
+        url = f"/api/reports/{self.report.id}/comments/"
+        body = json.dumps({"content": "Still not fixed"})
+        Comment.objects.filter(user=self.user, report=self.report).delete()
+        self.assertWithinBudget(14, 200, "post", url, data=body, content_type="application/json")
+        # A second comment by the same user updates the first one
+        self.assertWithinBudget(12, 200, "post", url, data=body, content_type="application/json")
+
+    def test_bulk_status(self):
+        def change(status):
+            body = json.dumps({"ids": list(Report.objects.values_list("id", flat=True)[:100]), "status": status})
+            return self.assertWithinBudget(14, 200, "post", "/api/reports/bulk-status/", data=body,
+                                           content_type="application/json")
+
+        small = change("in_progress")
+        self._grow()
+        self.assertLessEqual(change("resolved"), small, "query count grows with the number of reports")
+
+
+class BulkStatusTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Admin.objects.create_user("testadmin_bulk", "testadmin_bulk@example.com", is_staff=True)
+        cls.reports = [
+            Report.objects.create(user=cls.admin, title=f"Report {i}", description="Broken street light",
+                                  latitude=48.853, longitude=2.349)
+            for i in range(3)
+        ]
+
+    def test_bulk_comment_updates_existing_admin_comment(self):
+        AdminComment.objects.create(admin=self.admin, report=self.reports[0], content="Looking into it")
+        ids = [r.id for r in self.reports]
+
+        bulk_update_report_status(ids, "resolved", admin_id=self.admin.id, comment="Fixed")
+
+        comments = AdminComment.objects.filter(admin=self.admin)
+        self.assertEqual(sorted(comments.values_list("report_id", flat=True)), ids)
+        self.assertEqual(set(comments.values_list("content", flat=True)), {"Fixed"})
+        # Still one comment per (admin, report), so later edits find exactly one row
+        comment, created = create_or_update_admin_comment(self.admin.id, self.reports[0].id, "Closed")
+        self.assertFalse(created)
+        self.assertEqual(comment.content, "Closed")
+
+    def test_bulk_status_endpoint_requires_permission_and_csrf(self):
+        body = json.dumps({"ids": [self.reports[0].id], "status": "resolved"})
+        staff = User.objects.create_user("testuser_staff", "testuser_staff@example.com", is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.post("/api/reports/bulk-status/", body, content_type="application/json")
+        self.assertEqual(response.status_code, 403)
+
+        staff.user_permissions.add(Permission.objects.get(codename="change_report"))
+        csrf_client = Client(enforce_csrf_checks=True)
+        csrf_client.force_login(staff)
+        response = csrf_client.post("/api/reports/bulk-status/", body, content_type="application/json")
+        self.assertEqual(response.status_code, 403)
+
+        csrf_client.get("/")  # Sets the csrftoken cookie
+        response = csrf_client.post("/api/reports/bulk-status/", body, content_type="application/json",
+                                    HTTP_X_CSRFTOKEN=csrf_client.cookies["csrftoken"].value)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Report.objects.get(id=self.reports[0].id).status, "resolved")
+
+
+class ChangesSyncTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("testuser_sync", "testuser_sync@example.com")
+        # Rows written before sequence tracking existed all carry change_seq 0
+        cls.report_ids = [r.id for r in Report.objects.bulk_create([
+            Report(user=cls.user, title=f"Report {i}", description="Broken street light",
+                   latitude=48.853, longitude=2.349, change_seq=0)
+            for i in range(7)
+        ])]
+
+    def _sync(self, limit):
+        self.client.force_login(self.user)
+        seen, cursor = [], None
+        while True:
+            params = {"limit": limit, **({"since": cursor} if cursor else {})}
+            data = self.client.get("/api/changes/", params).json()
+            seen += [r["id"] for r in data["reports"]]
+            self.assertLessEqual(len(data["reports"]), limit)
+            cursor = data["cursor"]
+            if not data["has_more"]:
+                return seen, cursor
+
+    def test_synthetic_rows_page_on_sequence_values(self):
+        report_ids = generate_dataset(10, seed=1, legacy_ratio=0)["reports"]
+        seqs = list(Report.objects.filter(id__in=report_ids).values_list("change_seq", flat=True))
+        self.assertEqual(len(set(seqs)), len(seqs))
+
+    def test_full_sync_pages_through_one_sequence_value(self):
+        seen, _ = self._sync(limit=3)
+        self.assertEqual(len(seen), len(set(seen)), "a report was returned twice")
+        # Within the shared sequence value, reports come in id order
+        self.assertEqual([i for i in seen if i in self.report_ids], self.report_ids)
+
+    def test_vote_touches_its_report(self):
+        _, cursor = self._sync(limit=200)
+        report = Report.objects.get(id=self.report_ids[0])
+        Vote.objects.create(user=self.user, report=report)
+        data = self.client.get("/api/changes/", {"since": cursor}).json()
+        self.assertEqual([(r["id"], r["vote_count"]) for r in data["reports"]], [(report.id, 1)])
+
+    def test_backfilled_places_are_sent_to_synced_clients(self):
+        Report.objects.filter(id__in=self.report_ids).update(zipcode=75001)
+        _, cursor = self._sync(limit=200)
+        call_command("backfill_report_places", stdout=io.StringIO())
+        data = self.client.get("/api/changes/", {"since": cursor}).json()
+        places = {r["id"]: r["province"] for r in data["reports"]}
+        self.assertEqual(places, {report_id: "Paris" for report_id in self.report_ids})
+
+    def test_invalid_cursor(self):
+        self.client.force_login(self.user)
+        for cursor in ("-1", "3:vote:1", "abc"):
+            self.assertEqual(self.client.get("/api/changes/", {"since": cursor}).status_code, 400, cursor)
+
+
+class VoteBufferTests(TestCase):
+    def test_failing_batch_is_logged_not_raised(self):
+        user = User.objects.create_user("testuser_buffer", "testuser_buffer@example.com")
+        report = Report.objects.create(user=user, title="Report", description="Broken street light",
+                                       latitude=48.853, longitude=2.349)
+        # The flusher thread waits longer than the test, so flush() takes the batch
+        buffer = VoteBuffer(flush_interval=60)
+        self.addCleanup(buffer.stop)
+        buffer.submit(user.id, report.id)
+        with mock.patch("core.vote_buffer.publish_vote_counts", side_effect=RuntimeError("broker down")), \
+                self.assertLogs("core.vote_buffer", "ERROR"):
+            self.assertEqual(buffer.flush(), 1)
+        self.assertTrue(Vote.objects.filter(user=user, report=report).exists())
+
+
+class StoredImageTests(TestCase):
+    def test_files_are_deleted_after_commit(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(MEDIA_ROOT=directory):
+            image = default_storage.save("report_images/test.webp", ContentFile(b"image"))
+            thumbnail = default_storage.save("report_thumbnails/test.webp", ContentFile(b"thumbnail"))
+            stored = StoredImage.objects.create(sha256="0" * 64, image=image, thumbnail=thumbnail, ref_count=1,
+                                                dhash="0" * 16, dhash_band0=0, dhash_band1=0, dhash_band2=0,
+                                                dhash_band3=0)
+            with self.captureOnCommitCallbacks() as callbacks:
+                release_stored_image(stored.id)
+                # A rollback at this point would still find both files
+                self.assertTrue(default_storage.exists(image))
+            self.assertEqual(len(callbacks), 1)
+            callbacks[0]()
+            self.assertFalse(StoredImage.objects.filter(id=stored.id).exists())
+            self.assertFalse(default_storage.exists(image) or default_storage.exists(thumbnail))
+
+
+class VoteEventTests(TestCase):
+    def test_vote_counts_are_read_only_for_connected_clients(self):
+        with self.assertNumQueries(0):
+            publish_vote_counts([1, 2])
+
+        async def listen():
+            subscription, _ = event_broker.subscribe()
+            try:
+                await sync_to_async(publish_vote_counts)([1, 2])
+                return [(await asyncio.wait_for(subscription.queue.get(), 1))[1] for _ in range(2)]
+            finally:
+                event_broker.unsubscribe(subscription)
+
+        with self.assertNumQueries(1):
+            events = async_to_sync(listen)()
+        self.assertEqual(events, ["vote", "vote"])
+
+
+class ReportToolsAdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Admin.objects.create_superuser("testadmin_tools", "testadmin_tools@example.com", "pw")
+        cls.report = Report.objects.create(user=cls.admin, title="Report", description="Broken street light",
+                                           latitude=48.853, longitude=2.349, zipcode=75001)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_estimated_count_clamps_pages_past_the_end(self):
+        created = Report.objects.bulk_create([
+            Report(user=self.admin, title=f"Report {i}", description="Pothole", latitude=48.853, longitude=2.349)
+            for i in range(11)
+        ])
+        # MAX(id) stays where it is while 8 reports are gone
+        Report.objects.filter(id__in=[r.id for r in created[:8]]).delete()
+        max_id, exact = Report.objects.aggregate(Max("id"))["id__max"], Report.objects.count()
+        with mock.patch.object(EstimatedCountPaginator, "threshold", 1):
+            paginator = EstimatedCountPaginator(Report.objects.order_by("id"), 2)
+            self.assertEqual(paginator.num_pages, math.ceil(max_id / 2))
+            page = paginator.page(paginator.num_pages)
+        self.assertEqual((page.number, paginator.count, paginator.num_pages),
+                         (math.ceil(exact / 2), exact, math.ceil(exact / 2)))
+        self.assertEqual(len(page), exact - 2 * (page.number - 1))
+
+    def test_date_range_includes_the_whole_end_day(self):
+        Report.objects.filter(id=self.report.id).update(
+            created_at=make_aware(datetime(2024, 3, 10, 23, 30)))
+        url = "/admin/core/reporttools/?zipcode=75001&start=2024-03-10&end=2024-03-10"
+        self.assertContains(self.client.get(url), f"/admin/core/report/{self.report.id}/change/")
+        url = "/admin/core/reporttools/?zipcode=75001&start=2024-03-11"
+        self.assertNotContains(self.client.get(url), f"/admin/core/report/{self.report.id}/change/")
+
+    def test_search_without_matches_says_so(self):
+        response = self.client.get("/admin/core/reporttools/?zipcode=99999")
+        self.assertContains(response, "Search Results (0)")
+        self.assertContains(response, "No reports found.")
+
+    def test_invalid_input_shows_the_form_errors(self):
+        response = self.client.get("/admin/core/reporttools/?zipcode=75001&start=yesterday", follow=True)
+        self.assertContains(response, "From: Enter a valid date.")
+
+
+class ReportStatTests(TestCase):
+    def test_deleting_a_category_in_use_moves_its_reports_and_counts(self):
+        user = User.objects.create_user("testuser_stats", "testuser_stats@example.com")
+        category = ReportCategory.objects.create(name="Testing", description="Deleted by the test")
+        reports = [
+            Report.objects.create(user=user, title=f"Report {i}", description="Broken street light",
+                                  latitude=48.853, longitude=2.349, zipcode=75020, category=c)
+            for i, c in enumerate([category, category, None])
+        ]
+        before = ResourceVersion.snapshot([CHANGES_KEY, "reports"])
+
+        category.delete()
+
+        self.assertFalse(Report.objects.filter(id__in=[r.id for r in reports], category__isnull=False).exists())
+        # No other test data uses this zipcode
+        stats = ReportStat.objects.filter(zipcode=75020)
+        self.assertEqual(list(stats.values_list("category", "count")), [(None, 3)])
+        after = ResourceVersion.snapshot([CHANGES_KEY, "reports"])
+        self.assertGreater(after[CHANGES_KEY][0], before[CHANGES_KEY][0])
+        self.assertGreater(after["reports"][0], before["reports"][0])
+        moved = Report.objects.filter(id__in=[reports[0].id, reports[1].id]).values_list("change_seq", flat=True)
+        self.assertEqual(set(moved), {after[CHANGES_KEY][0]})
+
+
+    def test_bucket_without_category_or_zipcode_is_unique(self):
+        ReportStat.objects.create(day=date(2024, 3, 10), category=None, status="pending", zipcode=None, count=1)
+        with self.assertRaises(IntegrityError):
+            ReportStat.objects.create(day=date(2024, 3, 10), category=None, status="pending", zipcode=None, count=1)
+
+
+class AdmissionGateTests(TestCase):
+    def test_rejected_submission_keeps_the_users_token(self):
+        gate = AdmissionGate(workers=1, queue_size=0, user_limit=TokenBucket(burst=1, rate_per_minute=1))
+
+        async def submit_while_busy():
+            async with gate.admit("busy"):
+                with self.assertRaises(AdmissionRejected) as rejected:
+                    async with gate.admit("user"):
+                        pass
+            self.assertEqual(rejected.exception.status, 503)
+            # Once a slot is free, the single token is still there
+            async with gate.admit("user"):
+                pass
+
+        async_to_sync(submit_while_busy)()
+
+
+class CategoryTests(TestCase):
+    def test_translations_are_cached_and_skip_the_nlp_pool(self):
+        user = User.objects.create_user("testuser_categories", "testuser_categories@example.com")
+        self.client.force_login(user)
+        ReportCategory.objects.create(name="Testing", description="Test category")
+        translate_category_text.cache_clear()
+        with mock.patch("core.utils.auto_translate", side_effect=lambda text, **kwargs: f"fr:{text}") as translate, \
+                mock.patch.object(nlp_executor, "submit", side_effect=AssertionError("queued on the NLP pool")):
+            for _ in range(2):
+                response = self.client.get("/api/categories/")
+        self.assertIn({"id": mock.ANY, "name_en": "Testing", "name_fr": "fr:Testing",
+                       "description_en": "Test category", "description_fr": "fr:Test category"},
+                      response.json()["categories"])
+        self.assertEqual(translate.call_count, 2)
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("testuser_search", "testuser_search@example.com")
+        cls.voters = [User.objects.create_user(f"testuser_search_{i}", f"testuser_search_{i}@example.com")
+                      for i in range(3)]
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def _report(self, title, description):
+        return Report.objects.create(user=self.user, title=title, description=description,
+                                     latitude=48.853, longitude=2.349)
+
+    def _search(self, q):
+        return [r["id"] for r in self.client.get("/api/reports/search/", {"q": q}).json()["reports"]]
+
+    def test_ranking_combines_relevance_and_votes(self):
+        in_title = self._report("Lamppost broken", "Near the school")
+        in_body = self._report("Street issue", "A lamppost is broken")
+        voted = self._report("Street issue", "Another lamppost is broken on the corner")
+        # A title hit outweighs a body hit, a short body outweighs a long one
+        self.assertEqual(self._search("lamppost"), [in_title.id, in_body.id, voted.id])
+        Vote.objects.bulk_create([Vote(user=voter, report=voted) for voter in self.voters])
+        # Votes lift the weaker text match
+        ranked = self._search("lamppost")
+        self.assertLess(ranked.index(voted.id), ranked.index(in_body.id))
+
+    def test_edits_after_indexing_are_found(self):
+        report = self._report("Graffiti", "Paint on the wall")
+        self.assertEqual(self._search("graffiti"), [report.id])
+        report.title = "Overflowing bins"
+        report.save()
+        self.assertEqual(self._search("graffiti"), [])
+        self.assertEqual(self._search("overflowing"), [report.id])
+        report.delete()
+        self.assertEqual(self._search("overflowing"), [])
+
+    def test_invalid_page_size(self):
+        for n in ("abc", "1.5"):
+            self.assertEqual(self.client.get("/api/reports/search/", {"q": "bins", "n": n}).status_code, 400, n)
+        self.assertEqual(self.client.get("/api/reports/search/", {"q": "bins", "n": -3}).status_code, 200)
+
+
+class ConditionalRequestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("testuser_etag", "testuser_etag@example.com")
+        cls.admin = Admin.objects.create_user("testadmin_etag", "testadmin_etag@example.com", is_staff=True)
+        cls.report = Report.objects.create(user=cls.user, title="Report", description="Broken street light",
+                                           latitude=48.853, longitude=2.349)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def assertRevalidates(self, url, change):
+        """
+        An unchanged resource answers 304 to its own ETag; after `change` the ETag is stale.
+        """
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304, url)
+        change()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200, url)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_categories(self):
+        self.assertRevalidates("/api/categories/", lambda: ReportCategory.objects.create(name="Testing"))
+
+    def test_query_reports_after_a_vote(self):
+        self.assertRevalidates("/api/reports/query/", lambda: Vote.objects.create(user=self.user, report=self.report))
+
+    def test_query_reports_after_a_bulk_status_change(self):
+        self.assertRevalidates("/api/reports/query/",
+                               lambda: bulk_update_report_status([self.report.id], "resolved", admin_id=self.admin.id))
+
+    def test_comments_after_a_comment(self):
+        self.assertRevalidates(f"/api/reports/{self.report.id}/comments/",
+                               lambda: Comment.objects.create(user=self.user, report=self.report, content="Seen it"))
+
+
+class CommentThreadTests(TestCase):
+    def test_cursor_pages_through_equal_timestamps(self):
+        user = User.objects.create_user("testuser_thread", "testuser_thread@example.com")
+        admin = Admin.objects.create_user("testadmin_thread", "testadmin_thread@example.com", is_staff=True)
+        report = Report.objects.create(user=user, title="Report", description="Broken street light",
+                                       latitude=48.853, longitude=2.349)
+        Comment.objects.bulk_create([Comment(user=user, report=report, content=f"User {i}") for i in range(5)])
+        AdminComment.objects.bulk_create([
+            AdminComment(admin=admin, report=report, content=f"Admin {i}") for i in range(4)
+        ])
+        # Every comment shares one timestamp, so only (is_admin, id) orders them
+        moment = make_aware(datetime(2024, 3, 10, 12, 0))
+        Comment.objects.filter(report=report).update(created_at=moment)
+        AdminComment.objects.filter(report=report).update(created_at=moment)
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = build_comment_thread(report.id, cursor, limit=2)
+            self.assertLessEqual(len(page), 2)
+            seen += [(c["is_admin"], c["id"]) for c in page]
+            if cursor is None:
+                break
+
+        expected = [(False, c.id) for c in Comment.objects.filter(report=report).order_by("id")]
+        expected += [(True, c.id) for c in AdminComment.objects.filter(report=report).order_by("id")]
+        self.assertEqual(seen, expected)
+
+
+class ReportStatsTests(TestCase):
+    def test_counts_for_reports_with_and_without_activity(self):
+        user = User.objects.create_user("testuser_counts", "testuser_counts@example.com")
+        other = User.objects.create_user("testuser_counts_2", "testuser_counts_2@example.com")
+        admin = Admin.objects.create_user("testadmin_counts", "testadmin_counts@example.com", is_staff=True)
+        quiet, busy = [
+            Report.objects.create(user=user, title=f"Report {i}", description="Broken street light",
+                                  latitude=48.853, longitude=2.349)
+            for i in range(2)
+        ]
+        Vote.objects.bulk_create([Vote(user=user, report=busy), Vote(user=other, report=busy)])
+        Comment.objects.create(user=other, report=busy, content="Seen it")
+        AdminComment.objects.create(admin=admin, report=busy, content="On it")
+
+        self.client.force_login(user)
+        response = self.client.get("/api/reports/stats/", {"ids": f"{quiet.id},{busy.id},999999"})
+        self.assertEqual(response.json()["results"], [
+            {"report_id": quiet.id, "vote_count": 0, "comment_count": 0, "has_voted": False},
+            {"report_id": busy.id, "vote_count": 2, "comment_count": 2, "has_voted": True},
+        ])
+
+
+class QueryReportsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("testuser_query", "testuser_query@example.com")
+        traffic = ReportCategory.objects.create(name="Traffic")
+        waste = ReportCategory.objects.create(name="Waste")
+        rows = [
+            # title, category, status, province, latitude, longitude, day of March 2024, votes
+            ("a", traffic, "pending", "Paris", 48.85, 2.35, 1, 0),
+            ("b", waste, "resolved", "Paris", 48.86, 2.34, 2, 2),
+            ("c", traffic, "in_progress", "Val-de-Marne", 48.84, 2.44, 3, 1),
+            ("d", waste, "pending", "Hauts-de-Seine", 48.83, 2.24, 4, 0),
+        ]
+        voters = [User.objects.create_user(f"testuser_query_{i}", f"testuser_query_{i}@example.com")
+                  for i in range(2)]
+        cls.ids = {}
+        for title, category, status, province, lat, lon, day, votes in rows:
+            report = Report.objects.create(user=cls.user, title=title, description="Broken street light",
+                                           category=category, status=status, province=province, place=province,
+                                           latitude=lat, longitude=lon, zipcode=75001)
+            Report.objects.filter(id=report.id).update(created_at=make_aware(datetime(2024, 3, day, 12, 0)))
+            Vote.objects.bulk_create([Vote(user=voter, report=report) for voter in voters[:votes]])
+            cls.ids[title] = report.id
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def _titles(self, **params):
+        response = self.client.get("/api/reports/query/", params)
+        self.assertEqual(response.status_code, 200, params)
+        titles = {report_id: title for title, report_id in self.ids.items()}
+        return "".join(titles[r["id"]] for r in response.json()["reports"] if r["id"] in titles)
+
+    def test_filters(self):
+        self.assertEqual(self._titles(category="Traffic"), "ca")
+        self.assertEqual(self._titles(category="Traffic,Waste"), "dcba")
+        self.assertEqual(self._titles(status="pending,in_progress"), "dca")
+        self.assertEqual(self._titles(province="Paris"), "ba")
+        self.assertEqual(self._titles(start="2024-03-02", end="2024-03-03"), "cb")
+        self.assertEqual(self._titles(start="2024-03-02T12:00:00", end="2024-03-03T12:00:00"), "b")
+        self.assertEqual(self._titles(bbox="2.3,48.84,2.4,48.87"), "ba")
+        self.assertEqual(self._titles(category="Waste", status="pending"), "d")
+
+    def test_sorts_and_pages(self):
+        self.assertEqual(self._titles(), "dcba")
+        self.assertEqual(self._titles(sort="old"), "abcd")
+        self.assertEqual(self._titles(sort="votes"), "bcda")
+        self.assertEqual(self._titles(sort="province"), "dbac")
+        response = self.client.get("/api/reports/query/", {"sort": "old", "n": 3, "page": 2}).json()
+        self.assertEqual(([r["id"] for r in response["reports"]], response["has_more"]), ([self.ids["d"]], False))
+
+    def test_invalid_parameters(self):
+        for params in ({"n": "abc"}, {"page": "x"}, {"sort": "random"}, {"status": "lost"},
+                       {"start": "yesterday"}, {"bbox": "1,2,3"}):
+            self.assertEqual(self.client.get("/api/reports/query/", params).status_code, 400, params)
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("testuser_export", "testuser_export@example.com")
+        cls.reports = [
+            Report.objects.create(user=cls.user, title=f"Report {i}", description="Broken street light",
+                                  latitude=48.853, longitude=2.349)
+            for i in range(3)
+        ]
+
+    def stream(self, export_format):
+        # Only the ASGI handler streams aiter_export_lines(), so use the async client
+        async def read_export():
+            response = await self.async_client.get("/api/reports/export/", {"format": export_format})
+            return response, b"".join([chunk async for chunk in response.streaming_content])
+
+        self.async_client.force_login(self.user)
+        response, content = async_to_sync(read_export)()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return content.decode()
+
+    def test_streamed_csv_has_header_and_one_row_per_report(self):
+        lines = self.stream("csv").splitlines()
+        self.assertEqual(lines[0], ",".join(EXPORT_FIELDS))
+        self.assertEqual(len(lines) - 1, len(self.reports))
+        rows = list(csv.DictReader(io.StringIO("\n".join(lines))))
+        self.assertEqual(sorted(int(row["id"]) for row in rows), sorted(report.id for report in self.reports))
+
+    def test_streamed_ndjson_has_one_line_per_report(self):
+        rows = [json.loads(line) for line in self.stream("ndjson").splitlines()]
+        self.assertEqual(sorted(row["id"] for row in rows), sorted(report.id for report in self.reports))
+        self.assertEqual(list(rows[0]), EXPORT_FIELDS)
+
+    def test_streamed_export_matches_the_sync_one(self):
+        self.client.force_login(self.user)
+        for export_format in ("csv", "ndjson"):
+            response = self.client.get("/api/reports/export/", {"format": export_format})
+            self.assertEqual(self.stream(export_format), b"".join(response.streaming_content).decode())
@@ -3,10 +3,19 @@ from . import views
 
 urlpatterns = [
     path("reports/", views.reports_list, name="reports_list"),
+    path("reports/bulk-status/", views.reports_bulk_status, name="reports_bulk_status"),
+    path("reports/export/", views.export_reports, name="export_reports"),
+    path("reports/query/", views.query_reports, name="query_reports"),
+    path("reports/search/", views.search_reports, name="search_reports"),
+    path("reports/stats/", views.reports_stats, name="reports_stats"),
     path("reports/<int:report_id>/votes/", views.report_vote_count, name="report_vote_count"),
     path("votes/", views.votes_create, name="votes_create"),
     path("reports/top-pending/", views.top_pending_reports, name="top_pending_reports"),
     path("reports/<int:report_id>/comments/", views.report_comments, name="report_comments"),
+    path("changes/", views.changes_since, name="changes_since"),
+    path("events/", views.events_stream, name="events_stream"),
+    path("profiles/<str:name>/", views.profile_download, name="profile_download"),
+    path("stats/", views.report_statistics, name="report_statistics"),
     path("categories/", views.get_report_categories, name="get_report_categories"),
     path("reports/by_category/", views.get_reports_by_category, name="get_reports_by_category"),
 
@@ -1,25 +1,43 @@
 # core.views
 
 import json
-import os
-import uuid
+from datetime import datetime, time, timedelta
+from pathlib import Path
+from typing import Optional
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.core.handlers.asgi import ASGIRequest
 from django.db.models import Count, Max, Q
-from django.http import JsonResponse, HttpResponseBadRequest, HttpRequest, HttpResponse
-from django.shortcuts import get_object_or_404, render
-from django.utils.dateparse import parse_datetime
-from django.utils.timezone import now
-from django.views.decorators.csrf import csrf_exempt
+from django.http import (JsonResponse, HttpResponseBadRequest, HttpRequest, HttpResponse, StreamingHttpResponse,
+                         FileResponse)
+from django.shortcuts import aget_object_or_404, render
+from django.utils.crypto import constant_time_compare
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.timezone import is_naive, make_aware, now
+from django.views.decorators.csrf import csrf_exempt, ensure_csrf_cookie
 from django.views.decorators.http import require_GET, require_http_methods
 
-from core.cities.helper import get_zipcode_by_location
-from core.utils import (get_user_id, create_vote, create_or_update_comment, nlp_categorize, auto_translate, \
-                        build_report_data, detect_profanity)
-from .models import Report, Comment, ReportCategory, AdminComment
+from core.caching import conditional_on
+from core.cities.helper import get_city_by_location
+from core.utils import (get_user_id, aget_user_id, create_vote, create_or_update_comment, nlp_categorize, \
+                        translate_category_text, build_report_data, abuild_report_data, with_report_data, detect_profanity,
+                        build_comment_thread, build_report_stats, count_per_report, bulk_update_report_status,
+                        create_report, build_changes)
+from core.export import EXPORT_FORMATS, aiter_export_lines, iter_export_lines
+from core.metrics import registry
+from core.profiling import PROFILE_NAME
+from core.events import stream_events
+from core.executors import AdmissionRejected, nlp_gate, run_nlp
+from core.search import search_report_ids
+from core.stats import STAT_DIMENSIONS, query_report_stats
+from core.vote_buffer import vote_buffer
+from .models import Admin, Report, ReportCategory, Vote
 
 
 @login_required
+@ensure_csrf_cookie  # Read by scripts calling CSRF-protected endpoints such as bulk-status
 def home(request: HttpRequest) -> HttpResponse:
     """
     @brief Render the home page.
@@ -31,33 +49,186 @@ def home(request: HttpRequest) -> HttpResponse:
 
 @login_required
 @require_GET
-def report_vote_count(request, report_id):
-    report = get_object_or_404(Report, id=report_id)
-    vote_count = report.votes.count()
+@conditional_on("votes:{report_id}")
+async def report_vote_count(request, report_id):
+    report = await aget_object_or_404(Report, id=report_id)
+    vote_count = await report.votes.acount()
     return JsonResponse({"report_id": report_id, "vote_count": vote_count})
 
 
+MAX_STATS_IDS = 300
+
+
+@login_required
+@require_GET
+@conditional_on("votes", "comments")
+async def reports_stats(request):
+    """
+    Returns vote counts, comment counts and the current user's vote state for a batch of reports,
+    e.g. /api/reports/stats/?ids=1,2,3
+    """
+    try:
+        ids = {int(i) for i in request.GET.get("ids", "").split(",") if i.strip()}
+    except ValueError:
+        return JsonResponse({"error": "'ids' must be a comma-separated list of integers."}, status=400)
+
+    if not ids:
+        return JsonResponse({"error": "'ids' is required."}, status=400)
+    if len(ids) > MAX_STATS_IDS:
+        return JsonResponse({"error": f"At most {MAX_STATS_IDS} ids are allowed."}, status=400)
+
+    data = await sync_to_async(build_report_stats)(sorted(ids), await aget_user_id(request))
+    return JsonResponse({"results": data})
+
+
+@login_required
+@require_GET
+@conditional_on("reports", "votes", "categories")
+async def search_reports(request):
+    """
+    Full-text search over report titles, descriptions and their English translations,
+    ranked by relevance and votes, e.g. /api/reports/search/?q=pothole&n=20
+    """
+    query = request.GET.get("q", "").strip()
+    if not query:
+        return JsonResponse({"error": "Search text 'q' is required"}, status=400)
+    try:
+        N = min(max(int(request.GET.get("n", 20)), 1), 50)
+    except ValueError:
+        return JsonResponse({"error": "'n' must be an integer"}, status=400)
+
+    ranked_ids = [report_id for report_id, _ in await sync_to_async(search_report_ids)(query, N)]
+    reports = [r async for r in with_report_data(Report.objects.filter(id__in=ranked_ids))]
+    by_id = {r.id: r for r in reports}
+    data = await sync_to_async(build_report_data)([by_id[i] for i in ranked_ids if i in by_id])
+    return JsonResponse({"reports": data})
+
+
+def _parse_moment(value: str, end_of_day: bool = False) -> Optional[datetime]:
+    """
+    Parse an ISO datetime or date into an aware datetime. A bare end date covers that whole day.
+    """
+    try:
+        # Dates first: parse_datetime() also accepts a bare date, as midnight
+        if day := parse_date(value):
+            moment = datetime.combine(day + timedelta(days=1) if end_of_day else day, time.min)
+        else:
+            moment = parse_datetime(value)
+    except ValueError:
+        return None
+    if moment is not None and is_naive(moment):
+        moment = make_aware(moment)
+    return moment
+
+
+REPORT_QUERY_SORTS = {
+    "new": ("-created_at", "-id"),
+    "old": ("created_at", "id"),
+    "votes": ("-vote_count", "-created_at", "-id"),
+    "province": ("province", "place", "-created_at", "-id"),
+}
+REPORT_QUERY_MAX_PAGE_SIZE = 100
+
+
 @login_required
 @require_GET
-def top_pending_reports(request):
+@conditional_on("reports", "votes", "categories")
+async def query_reports(request):
+    """
+    Returns reports matching any combination of filters, compiled into one indexed query.
+
+    Query parameters (all optional):
+        category  comma-separated category names
+        status    comma-separated statuses, e.g. pending,in_progress
+        start/end ISO datetimes bounding created_at
+        bbox      min_lon,min_lat,max_lon,max_lat
+        province  comma-separated province names
+        sort      new (default), old, votes or province
+        n/page    page size (max 100) and 1-based page number
+    """
+    params = request.GET
+    try:
+        N = min(max(int(params.get("n", 20)), 1), REPORT_QUERY_MAX_PAGE_SIZE)
+        page = max(int(params.get("page", 1)), 1)
+    except ValueError:
+        return JsonResponse({"error": "'n' and 'page' must be integers"}, status=400)
+
+    sort = params.get("sort", "new")
+    if sort not in REPORT_QUERY_SORTS:
+        return JsonResponse({"error": f"'sort' must be one of: {', '.join(REPORT_QUERY_SORTS)}"}, status=400)
+
+    reports = Report.objects.all()
+
+    if categories := [c for c in params.get("category", "").split(",") if c]:
+        reports = reports.filter(category__name__in=categories)
+
+    if statuses := [s for s in params.get("status", "").split(",") if s]:
+        valid = {key for key, _ in Report.STATUS_CHOICES}
+        if not set(statuses) <= valid:
+            return JsonResponse({"error": f"'status' must be among: {', '.join(sorted(valid))}"}, status=400)
+        reports = reports.filter(status__in=statuses)
+
+    if provinces := [p for p in params.get("province", "").split(",") if p]:
+        reports = reports.filter(province__in=provinces)
+
+    for param, lookup in (("start", "created_at__gte"), ("end", "created_at__lt")):
+        if value := params.get(param):
+            moment = _parse_moment(value, end_of_day=(param == "end"))
+            if moment is None:
+                return JsonResponse({"error": f"Invalid '{param}' datetime"}, status=400)
+            reports = reports.filter(**{lookup: moment})
+
+    if bbox := params.get("bbox"):
+        try:
+            min_lon, min_lat, max_lon, max_lat = (float(v) for v in bbox.split(","))
+        except ValueError:
+            return JsonResponse({"error": "'bbox' must be min_lon,min_lat,max_lon,max_lat"}, status=400)
+        reports = reports.filter(latitude__range=(min_lat, max_lat), longitude__range=(min_lon, max_lon))
+
+    offset = (page - 1) * N
+    reports = [
+        r async for r in reports.select_related("user", "category")
+        # Correlated count instead of JOIN + GROUP BY, so date sorts can walk the created_at index
+        .annotate(vote_count=count_per_report(Vote.objects.all()))
+        .order_by(*REPORT_QUERY_SORTS[sort])[offset:offset + N + 1]
+    ]
+
+    return JsonResponse({
+        "reports": await sync_to_async(build_report_data)(reports[:N]),
+        "page": page,
+        "has_more": len(reports) > N,
+    })
+
+
+@login_required
+@require_GET
+@conditional_on("reports", "votes", "categories")
+async def top_pending_reports(request):
     N = int(request.GET.get("n", 10))  # by default 10, can be chosen by frontend
     reports = (
         Report.objects.filter(status="pending")
         .annotate(vote_count=Count("votes"))
         .order_by("-vote_count")[:N]
     )
-    data = build_report_data(reports)
+    data = await abuild_report_data(reports)
     return JsonResponse({"results": data})
 
 
+def _admission_rejected(e: AdmissionRejected) -> JsonResponse:
+    response = JsonResponse({"error": str(e)}, status=e.status)
+    response["Retry-After"] = str(e.retry_after)
+    return response
+
+
 @login_required
 @csrf_exempt
-def reports_list(request):
+@conditional_on("reports", "votes", "categories")
+async def reports_list(request):
     if request.method == "GET":
         N = int(request.GET.get("n", 10))
         reports = Report.objects.all().order_by("-created_at")[:N]
         # Build the report data using the abstracted helper function
-        data = build_report_data(reports)
+        data = await abuild_report_data(reports)
         # Return the response with the data
         return JsonResponse(data, safe=False)
     elif request.method == "POST":
@@ -79,12 +250,24 @@ def reports_list(request):
         title = data.get("title", "")
         description = data.get("description", "")
 
-        profanity_title = detect_profanity(title, 0.95)
-        profanity_desc = detect_profanity(description)
+        current_user_id = await aget_user_id(request)  # get current user id
+        if current_user_id is None:
+            return JsonResponse({"error": "User not authenticated"}, status=401)
+
+        try:
+            # The NLP stages run on the bounded NLP pool, leaving the event loop free for reads
+            async with nlp_gate.admit(current_user_id):
+                profanity_title = await run_nlp(detect_profanity, title, 0.95)
+                profanity_desc = await run_nlp(detect_profanity, description)
+                if not (profanity_title["is_toxic"] or profanity_desc["is_toxic"]):
+                    category_data = await run_nlp(nlp_categorize, description)
+        except AdmissionRejected as e:
+            return _admission_rejected(e)
+
         latitude = data["latitude"]
         longitude = data["longitude"]
 
-        zipcode = get_zipcode_by_location(latitude, longitude)
+        city = await sync_to_async(get_city_by_location)(latitude, longitude) or {}
 
         if profanity_title["is_toxic"] or profanity_desc["is_toxic"]:
             return JsonResponse({
@@ -93,48 +276,28 @@ def reports_list(request):
                 "description_score": profanity_desc["score"]
             }, status=400)
 
-        category_data = nlp_categorize(description)
         if category_data is None:
             return JsonResponse({
                 "error": "Your description could not be understood. Please describe the issue more clearly."
             }, status=400)
 
-        category = ReportCategory.objects.filter(name=category_data["name"]).first()
-
-        if not category:
-            category = ReportCategory.objects.create(name=category_data["name"],
-                                                     description=category_data["description"])
-
-        current_user_id = get_user_id(request)  # get current user id
-        if current_user_id is None:
-            return JsonResponse({"error": "User not authenticated"}, status=401)
-
-        report = Report.objects.create(
-            user_id=current_user_id,
-            category=category,
-            title=data["title"],
-            description=data["description"],
-            latitude=latitude,
-            longitude=longitude,
-            zipcode=zipcode,
+        report = await sync_to_async(create_report)(
+            current_user_id, category_data, data["title"], data["description"],
+            latitude, longitude, city, image
         )
 
-        if image:
-            ext = os.path.splitext(image.name)[1]
-            unique_name = f"{uuid.uuid4().hex}{ext}"
-            report.image.save(unique_name, image)
-
         return JsonResponse({"id": report.id}, status=201)
 
 
 @login_required
 @require_GET
-def user_reports_by_time(request):
+@conditional_on("reports", "votes", "categories")
+async def user_reports_by_time(request):
     """
     Returns reports created by the current user, filtered by an optional time range,
     and sorted by creation time in descending order (latest first).
     """
-    user_id = get_user_id(request)
+    user_id = await aget_user_id(request)
     if user_id is None:
         return JsonResponse({"error": "User not authenticated"}, status=401)
 
@@ -159,7 +322,7 @@ def user_reports_by_time(request):
         reports = reports.order_by("-created_at")
 
         # Use helper to build response data
-        data = build_report_data(reports)
+        data = await abuild_report_data(reports)
         return JsonResponse({"reports": data})
 
     except Exception as e:
@@ -168,11 +331,12 @@ def user_reports_by_time(request):
 
 @require_GET
 @login_required
-def user_voted_reports(request):
+@conditional_on("reports", "votes", "categories")
+async def user_voted_reports(request):
     """
     Returns reports the current user has voted on, sorted by latest vote time.
     """
-    user_id = get_user_id(request)
+    user_id = await aget_user_id(request)
     if user_id is None:
         return JsonResponse({"error": "User not authenticated"}, status=401)
 
@@ -182,21 +346,22 @@ def user_voted_reports(request):
         .order_by("-vote_time")
     )
 
-    if not reports.exists():
+    if not await reports.aexists():
         return JsonResponse({"reports": []})
 
-    data = build_report_data(reports)
+    data = await abuild_report_data(reports)
     return JsonResponse({"reports": data})
 
 
 @require_GET
 @login_required
-def user_commented_reports(request):
+@conditional_on("reports", "votes", "comments", "categories")
+async def user_commented_reports(request):
     """
     Returns reports the current user has commented on, sorted by latest comment time.
     Includes admin comments if the user is a superuser.
     """
-    user = request.user
+    user = await request.auser()
     user_id = user.id
 
     if user_id is None:
@@ -215,24 +380,28 @@ def user_commented_reports(request):
         .annotate(last_commented=Max("comments__created_at"))
         .order_by("-last_commented")
     )
-    if not reports.exists():
+    if not await reports.aexists():
         return JsonResponse({"reports": []})
 
-    return JsonResponse({"reports": build_report_data(reports)})
+    return JsonResponse({"reports": await abuild_report_data(reports)})
 
 
 @login_required
 @require_GET
-def get_report_categories(request):
-    categories = ReportCategory.objects.all()
+@conditional_on("categories")
+async def get_report_categories(request):
+    categories = [c async for c in ReportCategory.objects.all()]
+    # Translations are cached per text; a miss runs outside the NLP pool, so this read never
+    # queues behind report and comment moderation
+    translate = sync_to_async(translate_category_text, thread_sensitive=False)
     # Fetch categories and build data with both English and French names and descriptions
     data = [
         {
             "id": c.id,
             "name_en": c.name,  # English Name
-            "name_fr": auto_translate(c.name, from_lang="en", to_lang="fr"),  # French Name
+            "name_fr": await translate(c.name),  # French Name
             "description_en": c.description,  # English Description
-            "description_fr": auto_translate(c.description, from_lang="en", to_lang="fr"),  # French Description
+            "description_fr": await translate(c.description),  # French Description
         }
         for c in categories
     ]
@@ -241,7 +410,8 @@ def get_report_categories(request):
 
 @login_required
 @require_GET
-def get_reports_by_category(request):
+@conditional_on("reports", "votes", "categories")
+async def get_reports_by_category(request):
     category_name = request.GET.get("category_name")
     N = int(request.GET.get("n", 10))  # by default return 10 reports
 
@@ -249,7 +419,7 @@ def get_reports_by_category(request):
         return JsonResponse({"error": "Category name is required"}, status=400)
 
     # Get the corresponding category
-    category = ReportCategory.objects.filter(name=category_name).first()
+    category = await ReportCategory.objects.filter(name=category_name).afirst()
     if not category:
         return JsonResponse({"error": "Category not found"}, status=404)
 
@@ -260,7 +430,7 @@ def get_reports_by_category(request):
         .order_by("-vote_count")[:N]
     )
 
-    data = build_report_data(reports)
+    data = await abuild_report_data(reports)
     return JsonResponse({"reports": data})
 
 
@@ -278,6 +448,14 @@ def votes_create(request):
             if user_id is None or not (data.get("report_id"), int):
                 raise TypeError("Invalid input types for 'user_id' or 'report_id'")
 
+            # During vote surges, acknowledge right away and let the flusher batch the insert
+            if settings.VOTE_WRITE_BEHIND and isinstance(data["report_id"], int):
+                if not Report.objects.filter(pk=data["report_id"]).exists():
+                    return JsonResponse({"error": "Report not found."}, status=404)
+                if vote_buffer.submit(user_id, data["report_id"]):
+                    return JsonResponse({"queued": True}, status=202)
+                # Buffer full: fall back to a direct write
+
             # Call the create_vote utility function
             vote, created = create_vote(
                 user_id=user_id,
@@ -305,61 +483,49 @@ def votes_create(request):
 @login_required
 @csrf_exempt
 @require_http_methods(["GET", "POST"])
-def report_comments(request, report_id):
-    report = get_object_or_404(Report, id=report_id)
+@conditional_on("comments:{report_id}")
+async def report_comments(request, report_id):
+    report = await aget_object_or_404(Report, id=report_id)
 
     if request.method == "GET":
-        # Retrieve all comments for the report and return them
-        admin_comments = AdminComment.objects.filter(report=report).order_by("created_at")
-        admin_data = [
-            {
-                "id": c.id,
-                "user": c.admin_id,
-                "username": c.admin.username,
-                "is_admin": True,
-                "content": c.content,
-                "created_at": c.created_at,
-            }
-            for c in admin_comments
-        ]
-
-        comments = Comment.objects.filter(report=report).order_by("created_at")
-        user_data = [
-            {
-                "id": c.id,
-                "user": c.user_id,
-                "username": c.user.username,
-                "is_admin": False,
-                "content": c.content,
-                "created_at": c.created_at,
-            }
-            for c in comments
-        ]
-
-        all_data = admin_data + user_data
-
-        return JsonResponse({"comments": all_data})
+        # Merged, chronologically interleaved page of user and admin comments
+        try:
+            limit = min(max(int(request.GET.get("limit", 50)), 1), 200)
+            comments, next_cursor = await sync_to_async(build_comment_thread)(
+                report.id, request.GET.get("cursor"), limit
+            )
+        except ValueError:
+            return JsonResponse({"error": "Invalid 'limit' or 'cursor' parameter."}, status=400)
+
+        return JsonResponse({"comments": comments, "next_cursor": next_cursor})
 
     elif request.method == "POST":
         try:
             # Parse the incoming JSON data
             body = json.loads(request.body.decode())
-            user_id = get_user_id(request)
+            user_id = await aget_user_id(request)
             content = body.get("content")
 
-            profanity_result = detect_profanity(content)
+            # Ensure user_id and content are provided before spending model time on them
+            if not user_id or not content:
+                return HttpResponseBadRequest("Both 'user_id' and 'content' are required.")
+
+            try:
+                async with nlp_gate.admit(user_id):
+                    profanity_result = await run_nlp(detect_profanity, content)
+            except AdmissionRejected as e:
+                return _admission_rejected(e)
+
             if profanity_result["is_toxic"]:
                 return JsonResponse({
                     "error": "Your comment contains inappropriate language.",
                     "score": profanity_result["score"]
                 }, status=400)
 
-            # Ensure user_id and content are provided
-            if not user_id or not content:
-                return HttpResponseBadRequest("Both 'user_id' and 'content' are required.")
-
             # Call the existing utility function to create or update the comment
-            comment, created = create_or_update_comment(user_id=user_id, report_id=report_id, content=content)
+            comment, created = await sync_to_async(create_or_update_comment)(
+                user_id=user_id, report_id=report_id, content=content
+            )
 
             if comment is None:
                 # If the comment creation or update failed (invalid input), return an error
@@ -380,3 +546,162 @@ def report_comments(request, report_id):
         except Exception as e:
             # Catch any other errors
             return HttpResponseBadRequest(str(e))
+
+
+@login_required
+@require_GET
+@conditional_on("reports", "categories")
+async def report_statistics(request):
+    """
+    Returns report counts from the statistics rollups (staff only), e.g.
+    /api/stats/?group_by=day,category&start=2025-01-01&end=2025-01-31&status=pending,in_progress
+    """
+    if not (await request.auser()).is_staff:
+        return JsonResponse({"error": "Staff access required"}, status=403)
+
+    dimensions = [d for d in request.GET.get("group_by", "category").split(",") if d]
+    if not dimensions or len(dimensions) > 3 or any(d not in STAT_DIMENSIONS for d in dimensions):
+        return JsonResponse({
+            "error": f"'group_by' takes up to 3 of: {', '.join(STAT_DIMENSIONS)}"
+        }, status=400)
+
+    try:
+        start = parse_date(request.GET["start"]) if request.GET.get("start") else None
+        end = parse_date(request.GET["end"]) if request.GET.get("end") else None
+    except ValueError:
+        return JsonResponse({"error": "Invalid 'start' or 'end' date"}, status=400)
+
+    categories = [c for c in request.GET.get("category", "").split(",") if c]
+    statuses = [s for s in request.GET.get("status", "").split(",") if s]
+
+    data = await sync_to_async(query_report_stats)(dimensions, start, end, categories, statuses)
+    return JsonResponse({"group_by": dimensions, "results": data})
+
+
+MAX_BULK_STATUS_IDS = 1000
+
+
+@login_required
+@require_http_methods(["POST"])
+def reports_bulk_status(request):
+    """
+    Batch status change for users with the change_report permission, like the admin action:
+    POST {"ids": [1, 2, 3], "status": "resolved", "comment": "optional shared admin comment"}
+    The request must carry the CSRF token (X-CSRFToken header).
+    """
+    if not request.user.has_perm("core.change_report"):
+        return JsonResponse({"error": "Permission 'change_report' required"}, status=403)
+
+    try:
+        body = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON format."}, status=400)
+
+    ids = body.get("ids")
+    status = body.get("status")
+    comment = (body.get("comment") or "").strip()
+    if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids) or not ids:
+        return JsonResponse({"error": "'ids' must be a non-empty list of integers."}, status=400)
+    if len(ids) > MAX_BULK_STATUS_IDS:
+        return JsonResponse({"error": f"At most {MAX_BULK_STATUS_IDS} ids are allowed."}, status=400)
+    if comment and not Admin.objects.filter(pk=request.user.id).exists():
+        return JsonResponse({"error": "Only admins can attach a comment."}, status=403)
+
+    try:
+        updated = bulk_update_report_status(ids, status, admin_id=request.user.id, comment=comment)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse({"updated": updated})
+
+
+@require_GET
+def metrics(request):
+    """
+    Prometheus text exposition of the request, database and stage histograms of this process.
+    Readable with `Authorization: Bearer <METRICS_TOKEN>` or a staff session.
+    """
+    token = settings.METRICS_TOKEN
+    authorized = bool(token) and constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}")
+    if not (authorized or request.user.is_staff):
+        return JsonResponse({"error": "Staff access required"}, status=403)
+    return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@require_GET
+def profile_download(request, name):
+    """
+    Staff-only download of a stored sampling profile (collapsed stacks for flamegraph.pl/speedscope).
+    """
+    if not request.user.is_staff:
+        return JsonResponse({"error": "Staff access required"}, status=403)
+    path = Path(settings.PROFILE_DIR) / name
+    if not PROFILE_NAME.match(name) or not path.is_file():
+        return JsonResponse({"error": "Profile not found"}, status=404)
+    return FileResponse(path.open("rb"), as_attachment=True, filename=name, content_type="text/plain")
+
+
+MAX_CHANGES_LIMIT = 500
+
+
+@login_required
+@require_GET
+@conditional_on("changes")
+async def changes_since(request):
+    """
+    Delta sync for clients without a live connection, e.g. /api/changes/?since=1234
+    Omit 'since' for a full sync, then pass back the returned 'cursor' until 'has_more' is false.
+    """
+    since = request.GET.get("since") or None
+    try:
+        limit = min(max(int(request.GET.get("limit", 200)), 1), MAX_CHANGES_LIMIT)
+    except ValueError:
+        return JsonResponse({"error": "'limit' must be an integer"}, status=400)
+
+    try:
+        data = await sync_to_async(build_changes)(since, limit)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    return JsonResponse(data)
+
+
+@login_required
+@require_GET
+async def events_stream(request):
+    """
+    Server-Sent Events feed of live changes, e.g. new EventSource("/api/events/")
+
+    Events: report {id, action, status}, vote {report_id, vote_count} and comment {report_id}.
+    A "reset" event means events were missed and the client should reload its data.
+    """
+    if not isinstance(request, ASGIRequest):
+        # A never-ending response would hold a WSGI worker forever
+        return JsonResponse({"error": "Live events are only available on the ASGI server."}, status=503)
+
+    try:
+        last_event_id = int(request.headers["Last-Event-ID"])
+    except (KeyError, ValueError):
+        last_event_id = None
+
+    response = StreamingHttpResponse(stream_events(last_event_id), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # Disable proxy buffering (nginx)
+    return response
+
+
+@login_required
+@require_GET
+def export_reports(request):
+    """
+    Streams the full open-data export of reports, e.g. /api/reports/export/?format=csv
+    Rows are read in chunks and written as they are produced, so memory use does not grow with the table.
+    """
+    export_format = request.GET.get("format", "ndjson")
+    if export_format not in EXPORT_FORMATS:
+        return JsonResponse({"error": f"'format' must be one of: {', '.join(EXPORT_FORMATS)}"}, status=400)
+
+    # Under ASGI a sync iterator would be collected in full before sending; stream an async one instead
+    lines = aiter_export_lines(export_format) if isinstance(request, ASGIRequest) else iter_export_lines(export_format)
+    response = StreamingHttpResponse(lines, content_type=EXPORT_FORMATS[export_format])
+    response["Content-Disposition"] = f'attachment; filename="reports-{now():%Y-%m-%d}.{export_format}"'
+    return response
@@ -0,0 +1,148 @@
+# core.vote_buffer
+import atexit
+import logging
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Tuple
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+
+from .changes import touch_reports
+from .events import publish_vote_counts
+from .models import Vote
+
+logger = logging.getLogger(__name__)
+
+
+class VoteBuffer:
+    """
+    Write-behind buffer for votes.
+
+    Request threads only validate and append (user_id, report_id) pairs in memory. A background
+    flusher drains the buffer in batches with a single INSERT ... ON CONFLICT DO NOTHING per batch
+    and bumps the vote version counters once per batch instead of once per vote.
+    """
+
+    def __init__(self, batch_size: int = 500, flush_interval: float = 0.2, max_pending: int = 100_000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        # Keyed by (user_id, report_id): duplicate clicks collapse before reaching the database
+        self._pending: "OrderedDict[Tuple[int, int], None]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+
+    def submit(self, user_id: int, report_id: int) -> bool:
+        """
+        Queue a vote for insertion.
+
+        :return: True if the vote was queued, False if the buffer is full and the caller
+                 should write the vote directly.
+        """
+        with self._cond:
+            if len(self._pending) >= self.max_pending:
+                return False
+            self._pending[(user_id, report_id)] = None
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+        self._ensure_started()
+        return True
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """
+        Synchronously write every pending vote. Returns the number of votes handed to the database.
+        """
+        written = 0
+        while batch := self._take(self.batch_size):
+            self._write(batch)
+            written += len(batch)
+        return written
+
+    def stop(self):
+        """
+        Stop the flusher thread and write whatever is still pending.
+        """
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        thread = self._thread
+        if thread is not None:
+            thread.join()
+            self._thread = None
+        self.flush()
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._cond:
+            if self._thread is None and not self._stopping:
+                self._thread = threading.Thread(target=self._run, name="vdv-vote-flusher", daemon=True)
+                self._thread.start()
+
+    def _take(self, n: int) -> List[Tuple[int, int]]:
+        with self._cond:
+            batch = []
+            while self._pending and len(batch) < n:
+                batch.append(self._pending.popitem(last=False)[0])
+            return batch
+
+    def _run(self):
+        try:
+            while True:
+                with self._cond:
+                    if not self._stopping and len(self._pending) < self.batch_size:
+                        self._cond.wait(self.flush_interval)
+                    if self._stopping:
+                        return
+                close_old_connections()
+                while batch := self._take(self.batch_size):
+                    self._write(batch)
+        except Exception:
+            # Let the next submit() start a new flusher instead of queueing votes nobody writes
+            logger.exception("Vote flusher crashed, restarting it on the next vote")
+            with self._cond:
+                self._thread = None
+        finally:
+            connection.close()
+
+    def _write(self, batch: Iterable[Tuple[int, int]]):
+        batch = list(batch)
+        try:
+            self._insert(batch)
+            report_ids = {report_id for _, report_id in batch}
+            touch_reports(report_ids, "votes", *(f"votes:{report_id}" for report_id in report_ids))
+            publish_vote_counts(report_ids)
+        except Exception:
+            # Never let one batch kill the flusher thread
+            logger.exception("Writing a batch of %d votes failed", len(batch))
+
+    @staticmethod
+    def _insert(batch: List[Tuple[int, int]]):
+        try:
+            with transaction.atomic():
+                Vote.objects.bulk_create(
+                    [Vote(user_id=user_id, report_id=report_id) for user_id, report_id in batch],
+                    ignore_conflicts=True,
+                )
+        except DatabaseError:
+            # One bad row (e.g. a report deleted after validation) must not drop the whole batch
+            logger.warning("Batch insert of %d votes failed, retrying row by row", len(batch), exc_info=True)
+            for user_id, report_id in batch:
+                try:
+                    with transaction.atomic():
+                        Vote.objects.bulk_create([Vote(user_id=user_id, report_id=report_id)], ignore_conflicts=True)
+                except DatabaseError:
+                    logger.warning("Dropping vote of user %s on report %s", user_id, report_id)
+
+
+vote_buffer = VoteBuffer(
+    batch_size=settings.VOTE_BUFFER_BATCH_SIZE,
+    flush_interval=settings.VOTE_BUFFER_FLUSH_INTERVAL,
+)
+atexit.register(vote_buffer.stop)
@@ -20,8 +20,44 @@ document.addEventListener("DOMContentLoaded", () => {
 
     countInput.addEventListener("blur", fetchReports);
 
+    subscribeToLiveEvents();
 });
 
+// Patch the page from the server's live feed instead of refetching whole lists
+function subscribeToLiveEvents() {
+    if (!window.EventSource) return;
+
+    const source = new EventSource("/api/events/");
+    let refreshTimer = null;
+    const scheduleRefresh = () => {
+        // Coalesce bursts of new reports into a single list reload
+        clearTimeout(refreshTimer);
+        refreshTimer = setTimeout(() => {
+            fetchReports();
+            fetchUserActivity();
+        }, 1000);
+    };
+
+    source.addEventListener("vote", (e) => {
+        const {report_id, vote_count} = JSON.parse(e.data);
+        const el = document.getElementById(`votes-${report_id}`);
+        if (el) el.textContent = vote_count;
+    });
+
+    source.addEventListener("comment", (e) => {
+        const {report_id} = JSON.parse(e.data);
+        if (document.getElementById(`comments-${report_id}`)) loadComments(report_id);
+    });
+
+    source.addEventListener("report", scheduleRefresh);
+    source.addEventListener("reset", scheduleRefresh);
+
+    source.onerror = () => {
+        // Not served over ASGI (503): stop retrying, the page still works without live updates
+        if (source.readyState === EventSource.CLOSED) source.close();
+    };
+}
+
 function fetchCategories() {
     fetch("/api/categories/")
         .then(res => res.json())
@@ -88,9 +124,10 @@ function fetchReports() {
     let count = parseInt(document.getElementById("count-filter").value, 10);
     if (isNaN(count) || count < 10) count = 10;
 
-    const url = category
-        ? `/api/reports/by_category/?category_name=${encodeURIComponent(category)}&n=${count}`
-        : `/api/reports/?n=${count}`;
+    // Most-voted first within a category, newest first otherwise
+    const params = new URLSearchParams({n: count, sort: category ? "votes" : "new"});
+    if (category) params.set("category", category);
+    const url = `/api/reports/query/?${params}`;
 
     fetch(url)
         .then(res => res.json())
@@ -137,6 +174,7 @@ function renderReport(report, container) {
         vote_count,
         status,
         image_url,
+        thumbnail_url,
         category,
         user_name,
         user_email,
@@ -176,11 +214,17 @@ function renderReport(report, container) {
 
     // Image
     if (image_url) {
+        // Lists show the small thumbnail; the full image opens on click
+        const link = document.createElement("a");
+        link.href = image_url;
+        link.target = "_blank";
         const img = document.createElement("img");
-        img.src = image_url;
+        img.src = thumbnail_url || image_url;
         img.alt = t.image_placeholder;
+        img.loading = "lazy";
         img.style.maxWidth = "300px";
-        div.appendChild(img);
+        link.appendChild(img);
+        div.appendChild(link);
     }
 
     // Metadata
@@ -252,33 +296,48 @@ function renderReport(report, container) {
 
 
 function updateVoteCount(reportId) {
-    fetch(`/api/reports/${reportId}/votes/`)
+    refreshReportStats([reportId]);
+}
+
+// One batched request for the vote counts of many report cards
+function refreshReportStats(reportIds) {
+    if (reportIds.length === 0) return;
+
+    fetch(`/api/reports/stats/?ids=${reportIds.join(",")}`)
         .then(res => res.json())
         .then(data => {
-            const el = document.getElementById(`votes-${reportId}`);
-            if (el) {
-                const {vote_count} = data;
-                el.textContent = vote_count;
-            }
+            const {results} = data;
+            (results || []).forEach(({report_id, vote_count}) => {
+                const el = document.getElementById(`votes-${report_id}`);
+                if (el) el.textContent = vote_count;
+            });
         })
         .catch(err => {
             console.error("Failed to fetch:", err);
         });
 }
 
-function loadComments(reportId) {
-    fetch(`/api/reports/${reportId}/comments/`)
+function loadComments(reportId, cursor = null) {
+    const url = cursor
+        ? `/api/reports/${reportId}/comments/?cursor=${encodeURIComponent(cursor)}`
+        : `/api/reports/${reportId}/comments/`;
+
+    fetch(url)
         .then(res => res.json())
         .then(data => {
-            const {comments} = data;
-            renderComments(reportId, comments);
+            const {comments, next_cursor} = data;
+            if (cursor) {
+                appendComments(reportId, comments, next_cursor);
+            } else {
+                renderComments(reportId, comments, next_cursor);
+            }
         })
         .catch(err => {
             console.error("Failed to fetch:", err);
         });
 }
 
-function renderComments(reportId, comments) {
+function renderComments(reportId, comments, nextCursor) {
     const container = document.getElementById(`comments-${reportId}`);
     container.innerHTML = "";
 
@@ -289,11 +348,12 @@ function renderComments(reportId, comments) {
     visible.forEach(c => container.appendChild(createCommentElement(c)));
 
     const hiddenDiv = document.createElement("div");
+    hiddenDiv.id = `comments-hidden-${reportId}`;
     hiddenDiv.style.display = "none";
     hidden.forEach(c => hiddenDiv.appendChild(createCommentElement(c)));
     container.appendChild(hiddenDiv);
 
-    if (hidden.length > 0) {
+    if (hidden.length > 0 || nextCursor) {
         const toggle = document.createElement("button");
         toggle.textContent = t.all_comments;
         toggle.addEventListener("click", () => {
@@ -303,6 +363,27 @@ function renderComments(reportId, comments) {
         });
         container.appendChild(toggle);
     }
+
+    renderMoreButton(reportId, hiddenDiv, nextCursor);
+}
+
+function appendComments(reportId, comments, nextCursor) {
+    const hiddenDiv = document.getElementById(`comments-hidden-${reportId}`);
+    if (!hiddenDiv) return;
+    comments.forEach(c => hiddenDiv.appendChild(createCommentElement(c)));
+    renderMoreButton(reportId, hiddenDiv, nextCursor);
+}
+
+function renderMoreButton(reportId, hiddenDiv, nextCursor) {
+    const old = document.getElementById(`comments-more-${reportId}`);
+    if (old) old.remove();
+    if (!nextCursor) return;
+
+    const more = document.createElement("button");
+    more.id = `comments-more-${reportId}`;
+    more.textContent = t.more_comments;
+    more.addEventListener("click", () => loadComments(reportId, nextCursor));
+    hiddenDiv.appendChild(more);
 }
 
 function createCommentElement(c) {